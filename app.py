@@ -16,6 +16,7 @@ from flask_wtf.csrf import CSRFProtect, CSRFError
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from config import config
+from utils.cache import TenantCache
 
 # Initialize extensions
 db = SQLAlchemy()
@@ -27,6 +28,7 @@ limiter = Limiter(
     key_func=get_remote_address,
     storage_uri="memory://"
 )
+cache = TenantCache()
 
 def create_app(config_name='development'):
     """Application factory pattern for Flask app creation."""
@@ -40,6 +42,10 @@ def create_app(config_name='development'):
     app = Flask(__name__)
     app.config.from_object(config[config_name]) 
     
+    # Serialize JSON responses with orjson when it is installed
+    from utils.json_provider import init_json_provider
+    init_json_provider(app)
+    
     # Debug: Log which config is being used and SameSite setting
     print(f"=== USING CONFIG: {config_name} ===")
     print(f"=== SESSION_COOKIE_SAMESITE: {app.config.get('SESSION_COOKIE_SAMESITE')} ===")
@@ -84,6 +90,8 @@ def create_app(config_name='development'):
     csrf.init_app(app)
     # Initialize rate limiter
     limiter.init_app(app)
+    # Initialize tenant data cache (Redis when REDIS_URL is set)
+    cache.init_app(app)
     
     # Configure login manager
     login_manager.login_view = 'auth.login'
@@ -93,7 +101,8 @@ def create_app(config_name='development'):
     @login_manager.user_loader
     def load_user(user_id):
         from models.user import User
-        return User.query.get(int(user_id))
+        from utils.tenant_isolation import get_tenant_scoped
+        return get_tenant_scoped(User, int(user_id))
     
     # Initialize tenant middleware
     from utils.middleware import TenantMiddleware
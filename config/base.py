@@ -13,6 +13,16 @@ class Config:
     # Database
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///hockey.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        # Detect connections dropped by the server while idle; costs a round
+        # trip per checkout, so it can be turned off where pool_recycle is
+        # shorter than the server/proxy idle timeout
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'True').lower() in ['true', '1', 'yes'],
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+    }
+    
+    # Password hashing (werkzeug method string; cost dominates registration latency)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
     
     # Session
     SESSION_COOKIE_HTTPONLY = True
@@ -41,6 +51,10 @@ class Config:
     RATELIMIT_ENABLED = True
     RATELIMIT_STORAGE_URL = 'memory://'
     
+    # Caching (shared Redis when REDIS_URL is set, in-process otherwise)
+    REDIS_URL = os.environ.get('REDIS_URL') or None
+    CACHE_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_DEFAULT_TIMEOUT', 300))
+    
     # CORS
     CORS_ORIGINS = []
     
@@ -7,7 +7,8 @@ from .base import Config
 class DevelopmentConfig(Config):
     """Development-specific configuration overrides."""
     DEBUG = True
-    SQLALCHEMY_ECHO = True
+    # SQL statement logging is opt-in; it formats and writes every query
+    SQLALCHEMY_ECHO = os.environ.get('SQLALCHEMY_ECHO', 'False').lower() in ['true', '1', 'yes']
     
     # Override database URI for development
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///hockey_dev.db'
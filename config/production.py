@@ -14,6 +14,12 @@ class ProductionConfig(Config):
     # Database
     SQLALCHEMY_ECHO = False
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        **Config.SQLALCHEMY_ENGINE_OPTIONS,
+        # Size the pool for gunicorn worker concurrency
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+    }
     
     # Security (strict for production)
     WTF_CSRF_ENABLED = True
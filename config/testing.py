@@ -2,6 +2,7 @@
 
 import os
 from datetime import timedelta
+from sqlalchemy.pool import StaticPool
 from .base import Config 
 
 class TestingConfig:
@@ -13,11 +14,17 @@ class TestingConfig:
     
     # Database (in-memory SQLite for speed)
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        # One shared connection, so every session sees the same in-memory schema
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False},
+    }
     SQLALCHEMY_ECHO = False
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Security (disabled for testing)
     WTF_CSRF_ENABLED = False
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1'  # Minimum KDF cost; tests only need the code path
     SESSION_COOKIE_SECURE = False
     
     # Email (suppressed in tests)
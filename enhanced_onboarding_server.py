@@ -26,6 +26,10 @@ app.config.update(
     MAIL_DEFAULT_SENDER='noreply@hockey-manager.com',
 )
 
+# Serialize JSON responses with orjson when it is installed
+from utils.json_provider import init_json_provider
+init_json_provider(app)
+
 # Initialize extensions
 db = SQLAlchemy(app)
 login_manager = LoginManager(app)
@@ -204,21 +208,35 @@ def after_request(response):
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return db.session.get(User, int(user_id))
 
 # Utility functions
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 def is_valid_email(email):
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return EMAIL_PATTERN.match(email) is not None
 
 def is_strong_password(password):
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
-    if not re.search(r'[A-Z]', password):
+    
+    # Single pass over the password instead of one regex scan per rule
+    has_upper = has_lower = has_digit = False
+    for char in password:
+        if 'A' <= char <= 'Z':
+            has_upper = True
+        elif 'a' <= char <= 'z':
+            has_lower = True
+        elif char.isdecimal():
+            has_digit = True
+        if has_upper and has_lower and has_digit:
+            break
+    
+    if not has_upper:
         return False, "Password must contain at least one uppercase letter"
-    if not re.search(r'[a-z]', password):
+    if not has_lower:
         return False, "Password must contain at least one lowercase letter"
-    if not re.search(r'\d', password):
+    if not has_digit:
         return False, "Password must contain at least one number"
     return True, "Password is strong"
 
@@ -319,14 +337,12 @@ def check_availability():
                 result['subdomain']['available'] = False
                 result['subdomain']['message'] = 'Subdomain already taken'
                 
-                # Generate suggestions
-                suggestions = []
-                for i in range(1, 6):
-                    suggestion = f"{preferred_subdomain}{i}"
-                    if not Tenant.query.filter_by(subdomain=suggestion).first():
-                        suggestions.append(suggestion)
-                        if len(suggestions) >= 3:
-                            break
+                # Generate suggestions (one IN query for all candidates)
+                candidates = [f"{preferred_subdomain}{i}" for i in range(1, 6)]
+                taken = set(db.session.execute(
+                    db.select(Tenant.subdomain).where(Tenant.subdomain.in_(candidates))
+                ).scalars())
+                suggestions = [c for c in candidates if c not in taken][:3]
                 
                 result['subdomain']['suggestions'] = suggestions
     
@@ -450,11 +466,22 @@ def get_onboarding_status(subdomain):
     if not tenant:
         return jsonify({'error': 'Tenant not found'}), 404
     
-    # Calculate onboarding progress
-    admin_count = User.query.filter_by(tenant_id=tenant.id, role='admin').count()
-    user_count = User.query.filter_by(tenant_id=tenant.id).count()
-    player_count = Player.query.filter_by(tenant_id=tenant.id).count()
-    game_count = Game.query.filter_by(tenant_id=tenant.id).count()
+    # Calculate onboarding progress (all counts in a single round-trip)
+    def count_for_tenant(model, *criteria):
+        return (
+            db.select(db.func.count(model.id))
+            .where(model.tenant_id == tenant.id, *criteria)
+            .scalar_subquery()
+        )
+    
+    admin_count, user_count, player_count, game_count = db.session.execute(
+        db.select(
+            count_for_tenant(User, User.role == 'admin'),
+            count_for_tenant(User),
+            count_for_tenant(Player),
+            count_for_tenant(Game)
+        )
+    ).one()
     
     steps = {
         'organization_created': True,
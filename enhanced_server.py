@@ -26,6 +26,10 @@ app.config.update(
     MAIL_DEFAULT_SENDER='noreply@hockey-app.local',
 )
 
+# Serialize JSON responses with orjson when it is installed
+from utils.json_provider import init_json_provider
+init_json_provider(app)
+
 # Initialize extensions
 db = SQLAlchemy(app)
 login_manager = LoginManager(app)
@@ -226,21 +230,35 @@ def after_request(response):
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return db.session.get(User, int(user_id))
 
 # Utility functions
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 def is_valid_email(email):
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return EMAIL_PATTERN.match(email) is not None
 
 def is_strong_password(password):
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
-    if not re.search(r'[A-Z]', password):
+    
+    # Single pass over the password instead of one regex scan per rule
+    has_upper = has_lower = has_digit = False
+    for char in password:
+        if 'A' <= char <= 'Z':
+            has_upper = True
+        elif 'a' <= char <= 'z':
+            has_lower = True
+        elif char.isdecimal():
+            has_digit = True
+        if has_upper and has_lower and has_digit:
+            break
+    
+    if not has_upper:
         return False, "Password must contain at least one uppercase letter"
-    if not re.search(r'[a-z]', password):
+    if not has_lower:
         return False, "Password must contain at least one lowercase letter"
-    if not re.search(r'\d', password):
+    if not has_digit:
         return False, "Password must contain at least one number"
     return True, "Password is strong"
 
@@ -318,7 +336,8 @@ def register():
         return jsonify({'error': 'User with this email already exists in this tenant'}), 409
     
     # Check if this is the first user (becomes admin)
-    is_first_user = User.query.filter_by(tenant_id=tenant.id).count() == 0
+    # EXISTS stops at the first row instead of counting the whole tenant
+    is_first_user = not db.session.query(User.query.filter_by(tenant_id=tenant.id).exists()).scalar()
     
     # Create user (tenant_id will be auto-assigned by middleware)
     user = User(
@@ -0,0 +1,26 @@
+"""Add (game_id, player_id) index to assignments table
+
+Revision ID: 3c9e1f7a4b2d
+Revises: a2dbb312e625
+Create Date: 2026-10-16 11:42:08.519367
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9e1f7a4b2d'
+down_revision = 'a2dbb312e625'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('assignments', schema=None) as batch_op:
+        batch_op.create_index('ix_assignments_game_player', ['game_id', 'player_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('assignments', schema=None) as batch_op:
+        batch_op.drop_index('ix_assignments_game_player')
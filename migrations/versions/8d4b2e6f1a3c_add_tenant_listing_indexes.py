@@ -0,0 +1,32 @@
+"""Add tenant-scoped listing indexes to players and games
+
+Revision ID: 8d4b2e6f1a3c
+Revises: 3c9e1f7a4b2d
+Create Date: 2026-10-16 14:05:31.227804
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4b2e6f1a3c'
+down_revision = '3c9e1f7a4b2d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.create_index('ix_players_tenant_name', ['tenant_id', 'name'], unique=False)
+
+    with op.batch_alter_table('games', schema=None) as batch_op:
+        batch_op.create_index('ix_games_tenant_date_time', ['tenant_id', 'date', 'time'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('games', schema=None) as batch_op:
+        batch_op.drop_index('ix_games_tenant_date_time')
+
+    with op.batch_alter_table('players', schema=None) as batch_op:
+        batch_op.drop_index('ix_players_tenant_name')
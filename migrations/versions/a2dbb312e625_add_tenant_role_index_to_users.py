@@ -0,0 +1,26 @@
+"""Add (tenant_id, role) index to users table
+
+Revision ID: a2dbb312e625
+Revises: feaf6555325a
+Create Date: 2026-10-16 10:03:17.284906
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2dbb312e625'
+down_revision = 'feaf6555325a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_tenant_role', ['tenant_id', 'role'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_tenant_role')
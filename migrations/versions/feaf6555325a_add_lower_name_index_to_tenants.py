@@ -0,0 +1,26 @@
+"""Add lower(name) index to tenants table
+
+Revision ID: feaf6555325a
+Revises: 558e2dc041fe
+Create Date: 2026-10-16 09:12:41.508213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'feaf6555325a'
+down_revision = '558e2dc041fe'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Expression index so case-insensitive name lookups can use an index scan
+    # (supported by both PostgreSQL and SQLite)
+    op.create_index('ix_tenants_lower_name', 'tenants', [sa.text('lower(name)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tenants_lower_name', table_name='tenants')
@@ -4,7 +4,9 @@ Admin invitation model for inviting new team managers.
 from datetime import datetime, timedelta
 import secrets
 from app import db
+from utils.tenant_isolation import enforce_tenant_isolation
 
+@enforce_tenant_isolation
 class AdminInvitation(db.Model):
     """Model for storing admin invitations."""
     
@@ -27,6 +27,11 @@ class Assignment(TenantMixin, db.Model):
     player_id = db.Column(db.Integer, db.ForeignKey('players.id'), nullable=False, index=True)
     team_number = db.Column(db.Integer, nullable=True)  # 1 or 2 for team assignments
     
+    # Composite index for per-game player lookups (team moves and swaps)
+    __table_args__ = (
+        db.Index('ix_assignments_game_player', 'game_id', 'player_id'),
+    )
+    
     def __repr__(self):
         return f'<Assignment {self.task_description} for Player {self.player_id}>'
     
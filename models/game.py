@@ -42,6 +42,11 @@ class Game(TenantMixin, db.Model):
     
     # tenant_id is inherited from TenantMixin
     
+    # Schedule listings filter by tenant and sort by date, then time
+    __table_args__ = (
+        db.Index('ix_games_tenant_date_time', 'tenant_id', 'date', 'time'),
+    )
+    
     # Relationships
     invitations = db.relationship('Invitation', back_populates='game', lazy=True, cascade='all, delete-orphan')
     statistics = db.relationship('GameStatistic', backref='game', lazy=True, cascade='all, delete-orphan')
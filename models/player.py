@@ -44,8 +44,11 @@ class Player(TenantMixin, db.Model):
     
     # tenant_id is inherited from TenantMixin
     
-    # Unique constraint on email within tenant
-    __table_args__ = (db.UniqueConstraint('email', 'tenant_id', name='unique_player_email_per_tenant'),)
+    # Unique constraint on email within tenant; roster listings filter by tenant and sort by name
+    __table_args__ = (
+        db.UniqueConstraint('email', 'tenant_id', name='unique_player_email_per_tenant'),
+        db.Index('ix_players_tenant_name', 'tenant_id', 'name'),
+    )
     
     # Relationships
     invitations = db.relationship('Invitation', back_populates='player', lazy=True, cascade='all, delete-orphan')
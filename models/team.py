@@ -3,7 +3,9 @@ Team model with names and jersey colors.
 """
 from datetime import datetime
 from app import db
+from utils.tenant_isolation import enforce_tenant_isolation
 
+@enforce_tenant_isolation
 class Team(db.Model):
     """Team model for game organization."""
     
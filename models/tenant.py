@@ -6,6 +6,9 @@ from app import db
 from sqlalchemy import event
 import re
 
+# Subdomain format: alphanumeric and hyphens, start/end with alphanumeric
+SUBDOMAIN_PATTERN = re.compile(r'^[a-z0-9]([a-z0-9-]*[a-z0-9])?$')
+
 class Tenant(db.Model):
     """Tenant model for multi-tenant architecture."""
     
@@ -48,6 +51,11 @@ class Tenant(db.Model):
         slug = re.sub(r'[-\s]+', '-', slug)
         return slug.strip('-')
     
+    @staticmethod
+    def is_valid_slug(slug):
+        """Check that slug is already in the form generate_slug produces."""
+        return bool(slug) and len(slug) <= 50 and Tenant.generate_slug(slug) == slug
+    
     @staticmethod
     def is_valid_subdomain(subdomain):
         """Validate subdomain format."""
@@ -58,9 +66,7 @@ class Tenant(db.Model):
         if len(subdomain) < 3 or len(subdomain) > 50:
             return False
         
-        # Check format: alphanumeric and hyphens, start/end with alphanumeric
-        pattern = r'^[a-z0-9]([a-z0-9-]*[a-z0-9])?$'
-        return bool(re.match(pattern, subdomain))
+        return SUBDOMAIN_PATTERN.match(subdomain) is not None
     
     def get_url(self, scheme='http'):
         """Get the tenant's URL based on configuration."""
@@ -98,9 +104,25 @@ class Tenant(db.Model):
             'url': self.get_url()
         }
 
+# Expression index backing case-insensitive name lookups (onboarding availability checks)
+db.Index('ix_tenants_lower_name', db.func.lower(Tenant.name))
+
 # Event listeners for automatic slug generation
 @event.listens_for(Tenant.name, 'set')
 def generate_slug_on_name_change(target, value, oldvalue, initiator):
     """Automatically generate slug when name is set."""
     if value and (not target.slug or target.slug == Tenant.generate_slug(oldvalue)):
         target.slug = Tenant.generate_slug(value)
+
+@event.listens_for(Tenant, 'after_update')
+@event.listens_for(Tenant, 'after_delete')
+def invalidate_tenant_lookup_on_change(mapper, connection, target):
+    """Drop cached slug/subdomain resolutions when a tenant is changed or removed."""
+    from sqlalchemy import inspect
+    from utils.tenant import invalidate_tenant_lookup
+    
+    state = inspect(target)
+    identifiers = {target.slug, target.subdomain}
+    for attr in ('slug', 'subdomain'):
+        identifiers.update(state.attrs[attr].history.deleted)
+    invalidate_tenant_lookup(*identifiers)
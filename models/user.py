@@ -2,6 +2,7 @@
 User and admin models with authentication.
 """
 from datetime import datetime, timedelta
+from flask import current_app
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
@@ -9,6 +10,12 @@ from utils.base_model import TenantMixin
 from utils.tenant_isolation import enforce_tenant_isolation
 import secrets
 
+def _tokens_match(expected, given):
+    """Compare a stored token with a supplied one in constant time."""
+    if not expected or not isinstance(given, str):
+        return False
+    return secrets.compare_digest(expected.encode(), given.encode())
+
 @enforce_tenant_isolation
 class User(UserMixin, TenantMixin, db.Model):
     """User model with multi-tenant support."""
@@ -40,12 +47,21 @@ class User(UserMixin, TenantMixin, db.Model):
     # Multi-tenant foreign key
     tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False, index=True)
     
-    # Unique constraint on email within tenant
-    __table_args__ = (db.UniqueConstraint('email', 'tenant_id', name='unique_email_per_tenant'),)
+    # Unique constraint on email within tenant; composite index for per-tenant role lookups/counts
+    __table_args__ = (
+        db.UniqueConstraint('email', 'tenant_id', name='unique_email_per_tenant'),
+        db.Index('ix_users_tenant_role', 'tenant_id', 'role'),
+    )
+    
+    @staticmethod
+    def hash_password(password):
+        """Hash a password with the configured method (PASSWORD_HASH_METHOD)."""
+        method = current_app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+        return generate_password_hash(password, method=method)
     
     def set_password(self, password):
         """Set password hash."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = User.hash_password(password)
     
     def check_password(self, password):
         """Check password against hash."""
@@ -59,7 +75,7 @@ class User(UserMixin, TenantMixin, db.Model):
     
     def verify_reset_token(self, token):
         """Verify password reset token."""
-        if (self.reset_token == token and 
+        if (_tokens_match(self.reset_token, token) and 
             self.reset_token_expires and 
             self.reset_token_expires > datetime.utcnow()):
             return True
@@ -78,7 +94,7 @@ class User(UserMixin, TenantMixin, db.Model):
     
     def verify_email_token(self, token):
         """Verify email verification token."""
-        if (self.verification_token == token and 
+        if (_tokens_match(self.verification_token, token) and 
             self.verification_token_expires and 
             self.verification_token_expires > datetime.utcnow()):
             self.is_verified = True
@@ -75,9 +75,10 @@ def invite_admin():
         'invitation': invitation.to_dict()
     }), 201
 
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 def is_valid_email(email: str) -> bool:
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email or '') is not None
+    return EMAIL_PATTERN.match(email or '') is not None
 
 # ============ Users management ============
 @admin_bp.route('/users', methods=['GET'])
@@ -3,6 +3,7 @@ Assignment management API endpoints.
 """
 from flask import Blueprint, request, jsonify
 from utils.decorators import tenant_admin_required
+from utils.tenant_isolation import get_tenant_scoped
 
 assignments_bp = Blueprint('assignments', __name__)
 
@@ -59,7 +60,7 @@ def get_game_assignments_detailed(game_id):
     from services.team_assignment_service import TeamAssignmentService
     from app import db
     
-    game = Game.query.get(game_id)
+    game = get_tenant_scoped(Game, game_id)
     if not game:
         return jsonify({'error': 'Game not found'}), 404
     
@@ -73,7 +74,7 @@ def get_game_assignments_detailed(game_id):
     team_2_score = 0
     
     for assignment in assignments:
-        player = Player.query.get(assignment.player_id)
+        player = get_tenant_scoped(Player, assignment.player_id)
         if player:
             player_dict = player.to_dict()
             player_dict['assignment_id'] = assignment.id
@@ -419,6 +419,9 @@ def send_game_reminders(game_id):
         game_date = game.date.strftime('%A, %B %d, %Y')
         game_time = game.time.strftime('%I:%M %p')
         
+        # Send in batches over reused SMTP connections, then record results here
+        # on the request thread that owns the session
+        queued = []
         for invitation in invitations:
             player = invitation.player
             
@@ -429,20 +432,25 @@ def send_game_reminders(game_id):
             # Determine message type based on response status
             is_reminder = invitation.response is not None
             
-            success = EmailService.send_game_invitation(
-                player_email=player.email,
-                player_name=player.name,
-                game_date=game_date,
-                game_time=game_time,
-                venue=game.venue,
-                game_id=game.id,
-                language=player.preferred_language or 'en',
-                tenant_subdomain=game.tenant.subdomain,
-                invitation_token=invitation.token,
-                is_reminder=is_reminder,
-                has_responded=invitation.response is not None
-            )
-            
+            queued.append((invitation, {
+                'player_email': player.email,
+                'player_name': player.name,
+                'game_date': game_date,
+                'game_time': game_time,
+                'venue': game.venue,
+                'game_id': game.id,
+                'language': player.preferred_language or 'en',
+                'tenant_subdomain': game.tenant.subdomain,
+                'invitation_token': invitation.token,
+                'is_reminder': is_reminder,
+                'has_responded': invitation.response is not None
+            }))
+        
+        results = EmailService.send_game_invitations_bulk(
+            [job for _, job in queued]
+        ) if queued else []
+        
+        for (invitation, _), success in zip(queued, results):
             if success:
                 sent_count += 1
                 invitation.send_reminder()  # Track reminder sent
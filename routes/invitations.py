@@ -85,75 +85,85 @@ def send_game_invitations(game_id):
         failed_count = 0
         errors = []
         
-        for player_id in player_ids:
-            try:
-                # CRITICAL: Only get players from current tenant
-                player = Player.query.filter_by(
-                    id=player_id,
-                    tenant_id=g.tenant_id
-                ).first()
-                if not player:
-                    errors.append(f"Player {player_id} not found in your organization")
-                    failed_count += 1
-                    continue
-                
-                if not player.email:
-                    errors.append(f"Player {player.name} has no email address")
-                    failed_count += 1
-                    continue
-                
-                # Check if invitation already exists for this tenant
-                existing = Invitation.query.filter_by(
-                    game_id=game_id,
-                    player_id=player_id,
+        # Load the requested players and their existing invitations up front
+        # instead of two queries per player. CRITICAL: only current tenant's players.
+        # Keyed by str so ids posted as strings still match.
+        # Only the columns the send loop reads are fetched.
+        players_by_id = {
+            str(player.id): player for player in db.session.scalars(
+                Player.query_for_tenant_only(
+                    Player.id, Player.name, Player.email, Player.language,
                     tenant_id=g.tenant_id
-                ).first()
-                
-                if existing:
-                    errors.append(f"Invitation already exists for {player.name}")
-                    failed_count += 1
-                    continue
-                
-                # Create invitation with tenant_id
-                invitation = Invitation(
-                    game_id=game_id,
-                    player_id=player_id,
-                    invitation_type=invitation_type,
-                    status='pending',
-                    tenant_id=g.tenant_id
-                )
-                
-                db.session.add(invitation)
-                db.session.flush()  # Get the invitation ID
-                
-                # Send email
-                game_date = game.date.strftime('%A, %B %d, %Y')
-                game_time = game.time.strftime('%I:%M %p')
-                
-                success = EmailService.send_game_invitation(
-                    player_email=player.email,
-                    player_name=player.name,
-                    game_date=game_date,
-                    game_time=game_time,
-                    venue=game.venue,
-                    game_id=game_id,
-                    language=player.preferred_language or 'en',
-                    tenant_subdomain=None,  # Will be set from request context
-                    invitation_token=invitation.token  # Add this line
-                )
-                
-                if success:
-                    invitation.mark_sent()
-                    sent_count += 1
-                else:
-                    invitation.mark_bounced("Failed to send email")
-                    failed_count += 1
-                    errors.append(f"Failed to send email to {player.name}")
-                
-            except Exception as e:
-                current_app.logger.error(f"Error sending invitation to player {player_id}: {e}")
+                ).where(Player.id.in_(player_ids))
+            )
+        } if player_ids else {}
+        already_invited = frozenset(
+            row.player_id for row in Invitation.query.with_entities(Invitation.player_id).filter(
+                Invitation.game_id == game_id,
+                Invitation.tenant_id == g.tenant_id,
+                Invitation.player_id.in_([player.id for player in players_by_id.values()])
+            ).all()
+        ) if players_by_id else frozenset()
+        
+        # Build every invitation first so they are flushed together
+        pending = []
+        for player_id in player_ids:
+            player = players_by_id.get(str(player_id))
+            if not player:
+                errors.append(f"Player {player_id} not found in your organization")
+                failed_count += 1
+                continue
+            
+            if not player.email:
+                errors.append(f"Player {player.name} has no email address")
+                failed_count += 1
+                continue
+            
+            # Check if invitation already exists for this tenant
+            if player.id in already_invited:
+                errors.append(f"Invitation already exists for {player.name}")
+                failed_count += 1
+                continue
+            
+            # Create invitation with tenant_id
+            invitation = Invitation(
+                game_id=game_id,
+                player_id=player.id,
+                invitation_type=invitation_type,
+                status='pending',
+                tenant_id=g.tenant_id
+            )
+            pending.append((player, invitation))
+        
+        if pending:
+            db.session.add_all([invitation for _, invitation in pending])
+            db.session.flush()  # Get the invitation tokens/IDs
+        
+        # Send in batches over reused SMTP connections; invitation rows are
+        # updated here, on the request thread that owns the session
+        game_date = game.date.strftime('%A, %B %d, %Y')
+        game_time = game.time.strftime('%I:%M %p')
+        
+        results = EmailService.send_game_invitations_bulk([{
+            'player_email': player.email,
+            'player_name': player.name,
+            'game_date': game_date,
+            'game_time': game_time,
+            'venue': game.venue,
+            'game_id': game_id,
+            'language': player.preferred_language or 'en',
+            'tenant_subdomain': None,  # Will be set from request context
+            'invitation_token': invitation.token
+        } for player, invitation in pending]) if pending else []
+        
+        for (player, invitation), success in zip(pending, results):
+            if success:
+                invitation.mark_sent()
+                sent_count += 1
+            else:
+                invitation.mark_bounced("Failed to send email")
                 failed_count += 1
-                errors.append(f"Error with player {player_id}: {str(e)}")
+                errors.append(f"Failed to send email to {player.name}")
         
         db.session.commit()
         
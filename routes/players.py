@@ -3,7 +3,7 @@ Player management API endpoints with photo upload support.
 """
 from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required
-from sqlalchemy import or_
+from sqlalchemy import or_, func
 from werkzeug.utils import secure_filename
 from models.player import Player, PLAYER_TYPE_REGULAR, PLAYER_TYPE_SPARE
 from utils.decorators import tenant_admin_required, tenant_required
@@ -18,6 +18,9 @@ players_bp = Blueprint('players', __name__)
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
+# Pagination configuration
+MAX_PER_PAGE = 200
+
 def allowed_file(filename):
     """Check if file extension is allowed."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -116,11 +119,24 @@ def get_players():
     else:
         query = query.order_by(Player.name.asc())
     
-    players = query.all()
+    # Optional pagination (returns the full roster when no page is requested)
+    page = request.args.get('page', type=int)
+    per_page = request.args.get('per_page', 50, type=int)
+    
+    if page:
+        page = max(page, 1)
+        per_page = min(max(per_page, 1), MAX_PER_PAGE)
+        # Count in the database using the same filters, without the ORDER BY
+        total = query.order_by(None).with_entities(func.count(Player.id)).scalar()
+        # Tie-break on id so pages stay stable when sort keys repeat
+        players = query.order_by(Player.id).limit(per_page).offset((page - 1) * per_page).all()
+    else:
+        players = query.all()
+        total = len(players)
     
-    return jsonify({
+    response = {
         'players': [p.to_dict() for p in players],
-        'total': len(players),
+        'total': total,
         'filters': {
             'search': search if search else None,
             'position': position,
@@ -130,7 +146,16 @@ def get_players():
             'sort_by': sort_by,
             'sort_order': sort_order
         }
-    })
+    }
+    
+    if page:
+        response['pagination'] = {
+            'page': page,
+            'per_page': per_page,
+            'pages': (total + per_page - 1) // per_page
+        }
+    
+    return jsonify(response)
 
 @players_bp.route('/<int:player_id>', methods=['GET'])
 @tenant_required
@@ -1,22 +1,34 @@
 """
 Team configuration routes.
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required
-from models.tenant import Tenant
 from utils.tenant import get_current_tenant
 from utils.decorators import tenant_admin_required
-from app import db
+from utils.cache import team_config_key, invalidate_tenant_config
+from app import db, cache
 
 teams_bp = Blueprint('teams', __name__)
 
-@teams_bp.route('/config', methods=['GET'])
-@login_required
-def get_team_config():
-    """Get current tenant's team configuration."""
-    tenant = get_current_tenant()
-    
-    return jsonify({
+# Team name/color columns: (column, label for errors, store lowercased)
+TEAM_TEXT_FIELDS = (
+    ('team_name_1', 'Team 1 name', False),
+    ('team_name_2', 'Team 2 name', False),
+    ('team_color_1', 'Team 1 color', True),
+    ('team_color_2', 'Team 2 color', True),
+)
+
+# Default player requirement columns and whether they accept null (2-position mode)
+DEFAULT_REQUIREMENT_FIELDS = (
+    ('default_goaltenders', False),
+    ('default_defence', True),
+    ('default_forwards', True),
+    ('default_skaters', True),
+)
+
+def team_config_to_dict(tenant):
+    """Serialize the tenant's team configuration."""
+    return {
         'team_name_1': tenant.team_name_1,
         'team_name_2': tenant.team_name_2,
         'team_color_1': tenant.team_color_1,
@@ -25,7 +37,22 @@ def get_team_config():
         'default_defence': tenant.default_defence,
         'default_forwards': tenant.default_forwards,
         'default_skaters': tenant.default_skaters
-    })
+    }
+
+@teams_bp.route('/config', methods=['GET'])
+@login_required
+def get_team_config():
+    """Get current tenant's team configuration."""
+    tenant = get_current_tenant()
+    
+    cache_key = team_config_key(tenant.id)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return current_app.response_class(cached, mimetype='application/json')
+    
+    body = current_app.json.dumps(team_config_to_dict(tenant))
+    cache.set(cache_key, body)
+    return current_app.response_class(body, mimetype='application/json')
 
 @teams_bp.route('/config', methods=['PUT'])
 @tenant_admin_required
@@ -37,56 +64,30 @@ def update_team_config():
     if not data:
         return jsonify({'error': 'Request data required'}), 400
     
-    # Update team names
-    if 'team_name_1' in data:
-        name = data['team_name_1'].strip()
-        if not name:
-            return jsonify({'error': 'Team 1 name cannot be empty'}), 400
-        tenant.team_name_1 = name
-    
-    if 'team_name_2' in data:
-        name = data['team_name_2'].strip()
-        if not name:
-            return jsonify({'error': 'Team 2 name cannot be empty'}), 400
-        tenant.team_name_2 = name
-    
-    # Update team colors
-    if 'team_color_1' in data:
-        color = data['team_color_1'].strip().lower()
-        if not color:
-            return jsonify({'error': 'Team 1 color cannot be empty'}), 400
-        tenant.team_color_1 = color
-    
-    if 'team_color_2' in data:
-        color = data['team_color_2'].strip().lower()
-        if not color:
-            return jsonify({'error': 'Team 2 color cannot be empty'}), 400
-        tenant.team_color_2 = color
+    # Update team names and colors
+    for field, label, lowercase in TEAM_TEXT_FIELDS:
+        if field in data:
+            value = data[field].strip()
+            if lowercase:
+                value = value.lower()
+            if not value:
+                return jsonify({'error': f'{label} cannot be empty'}), 400
+            setattr(tenant, field, value)
     
     # Update default player requirements
-    if 'default_goaltenders' in data:
-        tenant.default_goaltenders = int(data['default_goaltenders'])
-    if 'default_defence' in data:
-        tenant.default_defence = int(data['default_defence']) if data['default_defence'] else None
-    if 'default_forwards' in data:
-        tenant.default_forwards = int(data['default_forwards']) if data['default_forwards'] else None
-    if 'default_skaters' in data:
-        tenant.default_skaters = int(data['default_skaters']) if data['default_skaters'] else None
+    for field, nullable in DEFAULT_REQUIREMENT_FIELDS:
+        if field in data:
+            value = data[field]
+            value = int(value) if value or not nullable else None
+            if getattr(tenant, field) != value:
+                setattr(tenant, field, value)
 
     try:
         db.session.commit()
+        invalidate_tenant_config(tenant.id)
         return jsonify({
             'message': 'Team configuration updated successfully',
-            'config': {
-                'team_name_1': tenant.team_name_1,
-                'team_name_2': tenant.team_name_2,
-                'team_color_1': tenant.team_color_1,
-                'team_color_2': tenant.team_color_2,
-                'default_goaltenders': tenant.default_goaltenders,
-                'default_defence': tenant.default_defence,
-                'default_forwards': tenant.default_forwards,
-                'default_skaters': tenant.default_skaters
-            }
+            'config': team_config_to_dict(tenant)
         })
     except Exception as e:
         db.session.rollback()
@@ -4,6 +4,8 @@ Tenant registration and onboarding flow routes.
 from flask import Blueprint, request, jsonify, current_app
 from werkzeug.security import generate_password_hash
 from flask_wtf.csrf import CSRFProtect
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
 from app import db, csrf
 from models.tenant import Tenant
 from models.user import User
@@ -15,30 +17,75 @@ logger = logging.getLogger(__name__)
 
 onboarding_bp = Blueprint('onboarding', __name__)
 
+# Availability statements, built once and reused with bound parameters
+_name_exists = db.exists().where(db.func.lower(Tenant.name) == bindparam('name'))
+_subdomain_exists = db.exists().where(Tenant.subdomain == bindparam('subdomain'))
+
+NAME_TAKEN_STMT = db.select(_name_exists)
+SUBDOMAIN_TAKEN_STMT = db.select(_subdomain_exists)
+REGISTRATION_CONFLICTS_STMT = db.select(_name_exists, _subdomain_exists)
+TAKEN_SUBDOMAINS_STMT = db.select(Tenant.subdomain).where(
+    Tenant.subdomain.in_(bindparam('candidates', expanding=True))
+)
+TENANT_BY_SUBDOMAIN_STMT = db.select(Tenant).where(Tenant.subdomain == bindparam('subdomain'))
+TAKEN_NAMES_AND_SUBDOMAINS_STMT = db.select(db.func.lower(Tenant.name), Tenant.subdomain).where(
+    db.or_(
+        db.func.lower(Tenant.name).in_(bindparam('names', expanding=True)),
+        Tenant.subdomain.in_(bindparam('subdomains', expanding=True)),
+    )
+)
+
+# Upper bound on values per list in a bulk availability check
+MAX_BULK_AVAILABILITY = 50
+
+# Validation patterns, compiled once at import
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+ORGANIZATION_NAME_PATTERN = re.compile(r'^[a-zA-Z0-9\s\-\'\.]+$')
+
 def is_valid_email(email):
     """Validate email format."""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return EMAIL_PATTERN.match(email) is not None
 
 def is_strong_password(password):
     """Validate password strength."""
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
-    if not re.search(r'[A-Z]', password):
+    
+    # Single pass over the password instead of one regex scan per rule
+    has_upper = has_lower = has_digit = False
+    for char in password:
+        if 'A' <= char <= 'Z':
+            has_upper = True
+        elif 'a' <= char <= 'z':
+            has_lower = True
+        elif char.isdecimal():
+            has_digit = True
+        if has_upper and has_lower and has_digit:
+            break
+    
+    if not has_upper:
         return False, "Password must contain at least one uppercase letter"
-    if not re.search(r'[a-z]', password):
+    if not has_lower:
         return False, "Password must contain at least one lowercase letter"
-    if not re.search(r'\d', password):
+    if not has_digit:
         return False, "Password must contain at least one number"
     return True, "Password is strong"
 
+def get_text_field(data, key, strip=True):
+    """Return a string field from the JSON body; missing or non-string values read as ''."""
+    value = data.get(key)
+    if not isinstance(value, str):
+        return ''
+    return value.strip() if strip else value
+
 def validate_organization_name(name):
     """Validate organization name."""
-    if not name or len(name.strip()) < 3:
+    name = name.strip() if name else ''
+    if len(name) < 3:
         return False, "Organization name must be at least 3 characters long"
-    if len(name.strip()) > 100:
+    if len(name) > 100:
         return False, "Organization name must be less than 100 characters"
-    if not re.match(r'^[a-zA-Z0-9\s\-\'\.]+$', name.strip()):
+    if not ORGANIZATION_NAME_PATTERN.match(name):
         return False, "Organization name contains invalid characters"
     return True, "Valid organization name"
 
@@ -51,8 +98,8 @@ def check_availability():
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
-    organization_name = data.get('organization_name', '').strip()
-    preferred_subdomain = data.get('preferred_subdomain', '').strip().lower()
+    organization_name = get_text_field(data, 'organization_name')
+    preferred_subdomain = get_text_field(data, 'preferred_subdomain').lower()
     
     result = {
         'organization_name': {
@@ -69,47 +116,118 @@ def check_availability():
     }
     
     # Validate organization name
+    name_ok = False
     if organization_name:
-        is_valid, message = validate_organization_name(organization_name)
-        if not is_valid:
+        name_ok, message = validate_organization_name(organization_name)
+        if not name_ok:
             result['organization_name']['available'] = False
             result['organization_name']['message'] = message
-        else:
-            # Check if organization name already exists
-            existing_tenant = Tenant.query.filter(
-                db.func.lower(Tenant.name) == organization_name.lower()
-            ).first()
-            if existing_tenant:
-                result['organization_name']['available'] = False
-                result['organization_name']['message'] = 'Organization name already exists'
-    
-    # Validate and check subdomain
+    
+    # Validate subdomain
+    subdomain_ok = False
     if preferred_subdomain:
-        is_valid, message = validate_subdomain(preferred_subdomain)
-        if not is_valid:
+        subdomain_ok, message = validate_subdomain(preferred_subdomain)
+        if not subdomain_ok:
             result['subdomain']['available'] = False
             result['subdomain']['message'] = message
-        else:
-            # Check if subdomain already exists
-            existing_subdomain = Tenant.query.filter_by(subdomain=preferred_subdomain).first()
-            if existing_subdomain:
-                result['subdomain']['available'] = False
-                result['subdomain']['message'] = 'Subdomain already taken'
-                
-                # Generate suggestions
-                base_subdomain = preferred_subdomain
-                suggestions = []
-                for i in range(1, 6):
-                    suggestion = f"{base_subdomain}{i}"
-                    if not Tenant.query.filter_by(subdomain=suggestion).first():
-                        suggestions.append(suggestion)
-                        if len(suggestions) >= 3:
-                            break
-                
-                result['subdomain']['suggestions'] = suggestions
+    
+    # Check whichever values are well-formed in a single round-trip
+    name_taken = subdomain_taken = False
+    if name_ok and subdomain_ok:
+        name_taken, subdomain_taken = db.session.execute(
+            REGISTRATION_CONFLICTS_STMT,
+            {'name': organization_name.lower(), 'subdomain': preferred_subdomain}
+        ).one()
+    elif name_ok:
+        name_taken = db.session.execute(
+            NAME_TAKEN_STMT, {'name': organization_name.lower()}
+        ).scalar()
+    elif subdomain_ok:
+        subdomain_taken = db.session.execute(
+            SUBDOMAIN_TAKEN_STMT, {'subdomain': preferred_subdomain}
+        ).scalar()
+    
+    if name_taken:
+        result['organization_name']['available'] = False
+        result['organization_name']['message'] = 'Organization name already exists'
+    
+    if subdomain_taken:
+        result['subdomain']['available'] = False
+        result['subdomain']['message'] = 'Subdomain already taken'
+        
+        # Generate suggestions (one IN query for all candidates)
+        candidates = [f"{preferred_subdomain}{i}" for i in range(1, 6)]
+        taken = set(db.session.execute(
+            TAKEN_SUBDOMAINS_STMT, {'candidates': candidates}
+        ).scalars())
+        result['subdomain']['suggestions'] = [c for c in candidates if c not in taken][:3]
     
     return jsonify(result), 200
 
+@onboarding_bp.route('/check-availability-bulk', methods=['POST'])
+@csrf.exempt
+def check_availability_bulk():
+    """Check many organization names and subdomains with a single query."""
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    names = data.get('organization_names', [])
+    subdomains = data.get('subdomains', [])
+    if not isinstance(names, list) or not isinstance(subdomains, list):
+        return jsonify({'error': 'organization_names and subdomains must be lists'}), 400
+    if len(names) > MAX_BULK_AVAILABILITY or len(subdomains) > MAX_BULK_AVAILABILITY:
+        return jsonify({'error': f'At most {MAX_BULK_AVAILABILITY} values per list'}), 400
+    
+    names = [str(name).strip() for name in names]
+    subdomains = [str(subdomain).strip().lower() for subdomain in subdomains]
+    
+    name_results = []
+    for name in names:
+        is_valid, message = validate_organization_name(name)
+        name_results.append({
+            'value': name,
+            'available': is_valid,
+            'message': 'Available' if is_valid else message
+        })
+    
+    subdomain_results = []
+    for subdomain in subdomains:
+        is_valid, message = validate_subdomain(subdomain)
+        subdomain_results.append({
+            'value': subdomain,
+            'available': is_valid,
+            'message': 'Available' if is_valid else message
+        })
+    
+    # Only well-formed values need a database check
+    names_to_check = [r['value'].lower() for r in name_results if r['available']]
+    subdomains_to_check = [r['value'] for r in subdomain_results if r['available']]
+    
+    if names_to_check or subdomains_to_check:
+        taken_names, taken_subdomains = set(), set()
+        for taken_name, taken_subdomain in db.session.execute(
+            TAKEN_NAMES_AND_SUBDOMAINS_STMT,
+            {'names': names_to_check, 'subdomains': subdomains_to_check}
+        ):
+            taken_names.add(taken_name)
+            taken_subdomains.add(taken_subdomain)
+        
+        for r in name_results:
+            if r['available'] and r['value'].lower() in taken_names:
+                r['available'] = False
+                r['message'] = 'Organization name already exists'
+        for r in subdomain_results:
+            if r['available'] and r['value'] in taken_subdomains:
+                r['available'] = False
+                r['message'] = 'Subdomain already taken'
+    
+    return jsonify({
+        'organization_names': name_results,
+        'subdomains': subdomain_results
+    }), 200
+
 @onboarding_bp.route('/register', methods=['POST'])
 @csrf.exempt
 def register_tenant():
@@ -120,43 +238,44 @@ def register_tenant():
         return jsonify({'error': 'No data provided'}), 400
     
     # Extract and validate data
-    organization_name = data.get('organization_name', '').strip()
-    subdomain = data.get('subdomain', '').strip().lower()
-    admin_email = data.get('admin_email', '').strip().lower()
-    admin_password = data.get('admin_password', '')
-    admin_first_name = data.get('admin_first_name', '').strip()
-    admin_last_name = data.get('admin_last_name', '').strip()
+    organization_name = get_text_field(data, 'organization_name')
+    subdomain = get_text_field(data, 'subdomain').lower()
+    admin_email = get_text_field(data, 'admin_email').lower()
+    admin_password = get_text_field(data, 'admin_password', strip=False)
+    admin_first_name = get_text_field(data, 'admin_first_name')
+    admin_last_name = get_text_field(data, 'admin_last_name')
     
     # Validation
     errors = []
     
     # Validate organization name
+    name_format_ok = False
     if not organization_name:
         errors.append("Organization name is required")
     else:
-        is_valid, message = validate_organization_name(organization_name)
-        if not is_valid:
+        name_format_ok, message = validate_organization_name(organization_name)
+        if not name_format_ok:
             errors.append(message)
-        else:
-            # Check if organization already exists
-            existing_org = Tenant.query.filter(
-                db.func.lower(Tenant.name) == organization_name.lower()
-            ).first()
-            if existing_org:
-                errors.append("Organization name already exists")
     
     # Validate subdomain
+    subdomain_format_ok = False
     if not subdomain:
         errors.append("Subdomain is required")
     else:
-        is_valid, message = validate_subdomain(subdomain)
-        if not is_valid:
+        subdomain_format_ok, message = validate_subdomain(subdomain)
+        if not subdomain_format_ok:
             errors.append(message)
-        else:
-            # Check if subdomain already exists
-            existing_subdomain = Tenant.query.filter_by(subdomain=subdomain).first()
-            if existing_subdomain:
-                errors.append("Subdomain already taken")
+    
+    # Check name and subdomain availability in a single round-trip
+    if name_format_ok or subdomain_format_ok:
+        name_taken, subdomain_taken = db.session.execute(
+            REGISTRATION_CONFLICTS_STMT,
+            {'name': organization_name.lower(), 'subdomain': subdomain}
+        ).one()
+        if name_format_ok and name_taken:
+            errors.append("Organization name already exists")
+        if subdomain_format_ok and subdomain_taken:
+            errors.append("Subdomain already taken")
     
     # Validate admin email
     if not admin_email:
@@ -181,6 +300,10 @@ def register_tenant():
     if errors:
         return jsonify({'errors': errors}), 400
     
+    # Hash before opening the transaction so the slow KDF doesn't hold the
+    # tenant insert (and its unique-index locks) open
+    admin_password_hash = User.hash_password(admin_password)
+    
     try:
         # Create tenant
         slug = generate_tenant_slug(organization_name)
@@ -203,7 +326,7 @@ def register_tenant():
             is_active=True,
             tenant_id=tenant.id
         )
-        admin_user.set_password(admin_password)
+        admin_user.password_hash = admin_password_hash
         db.session.add(admin_user)
         
         # Commit transaction
@@ -235,6 +358,11 @@ def register_tenant():
             ]
         }), 201
         
+    except IntegrityError:
+        # Lost a race with a concurrent registration; unique constraints on
+        # tenants.slug/subdomain are the final arbiter
+        db.session.rollback()
+        return jsonify({'errors': ["Organization name or subdomain already taken"]}), 409
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error registering tenant: {e}")
@@ -243,31 +371,48 @@ def register_tenant():
 @onboarding_bp.route('/onboarding-status/<subdomain>')
 def get_onboarding_status(subdomain):
     """Get onboarding status for a tenant."""
-    tenant = Tenant.query.filter_by(subdomain=subdomain).first()
+    tenant = db.session.execute(
+        TENANT_BY_SUBDOMAIN_STMT, {'subdomain': subdomain}
+    ).scalar_one_or_none()
     
     if not tenant:
         return jsonify({'error': 'Tenant not found'}), 404
     
-    # Check onboarding completion status
-    admin_users = User.query.filter_by(tenant_id=tenant.id, role='admin').count()
-    total_users = User.query.filter_by(tenant_id=tenant.id).count()
-    
     # Import other models to check setup status
     from models.player import Player
     from models.game import Game
     
-    total_players = Player.query.filter_by(tenant_id=tenant.id).count()
-    total_games = Game.query.filter_by(tenant_id=tenant.id).count()
+    # Check onboarding completion status (all counts in a single round-trip)
+    def count_for_tenant(model, *criteria):
+        return (
+            db.select(db.func.count(model.id))
+            .where(model.tenant_id == tenant.id, *criteria)
+            .scalar_subquery()
+        )
+    
+    admin_users, total_users, total_players, total_games = db.session.execute(
+        db.select(
+            count_for_tenant(User, User.role == 'admin'),
+            count_for_tenant(User),
+            count_for_tenant(Player),
+            count_for_tenant(Game)
+        )
+    ).one()
+    
+    admin_user_created = admin_users > 0
+    players_added = total_players > 0
+    first_game_scheduled = total_games > 0
     
     onboarding_steps = {
         'organization_created': True,  # If we're here, it's created
-        'admin_user_created': admin_users > 0,
-        'players_added': total_players > 0,
-        'first_game_scheduled': total_games > 0,
+        'admin_user_created': admin_user_created,
+        'players_added': players_added,
+        'first_game_scheduled': first_game_scheduled,
         'team_configuration_set': False  # TODO: Implement team config check
     }
     
-    completion_percentage = sum(onboarding_steps.values()) / len(onboarding_steps) * 100
+    # Five steps worth 20% each: organization is always created, team config not yet tracked
+    completion_percentage = (1 + admin_user_created + players_added + first_game_scheduled) * 20
     
     return jsonify({
         'tenant': {
@@ -277,7 +422,7 @@ def get_onboarding_status(subdomain):
             'created_at': tenant.created_at.isoformat()
         },
         'onboarding_steps': onboarding_steps,
-        'completion_percentage': round(completion_percentage),
+        'completion_percentage': completion_percentage,
         'statistics': {
             'admin_users': admin_users,
             'total_users': total_users,
@@ -328,11 +473,19 @@ def send_welcome_email():
     if not data or not data.get('tenant_id'):
         return jsonify({'error': 'Tenant ID required'}), 400
     
-    tenant = Tenant.query.get(data['tenant_id'])
+    try:
+        tenant_id = int(data['tenant_id'])
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid tenant ID'}), 400
+    
+    # Primary-key load checks the identity map before emitting SQL
+    tenant = db.session.get(Tenant, tenant_id)
     if not tenant:
         return jsonify({'error': 'Tenant not found'}), 404
     
-    admin_user = User.query.filter_by(tenant_id=tenant.id, role='admin').first()
+    admin_user = db.session.execute(
+        db.select(User).where(User.tenant_id == tenant.id, User.role == 'admin').limit(1)
+    ).scalar_one_or_none()
     if not admin_user:
         return jsonify({'error': 'Admin user not found'}), 404
     
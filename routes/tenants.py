@@ -1,14 +1,34 @@
 """
 Tenant management routes for multi-tenant architecture.
 """
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, request, jsonify, g, current_app
+from sqlalchemy import bindparam
 from models.tenant import Tenant
 from utils.decorators import tenant_admin_required
 from utils.tenant import get_current_tenant
-from app import db
+from utils.cache import tenant_config_key, invalidate_tenant_config
+from app import db, cache
 
 tenants_bp = Blueprint('tenants', __name__)
 
+# Availability statements, built once and reused with bound parameters
+SLUG_TAKEN_STMT = db.select(db.exists().where(Tenant.slug == bindparam('slug')))
+SUBDOMAIN_TAKEN_STMT = db.select(db.exists().where(Tenant.subdomain == bindparam('subdomain')))
+
+# Columns exposed by /config, in response order
+TENANT_CONFIG_FIELDS = (
+    'position_mode',
+    'team_name_1',
+    'team_name_2',
+    'team_color_1',
+    'team_color_2',
+    'assignment_mode',
+)
+
+def tenant_config_to_dict(tenant):
+    """Serialize the tenant's configuration settings."""
+    return {field: getattr(tenant, field) for field in TENANT_CONFIG_FIELDS}
+
 @tenants_bp.route('/', methods=['GET'])
 def get_current_tenant_info():
     """Get current tenant information."""
@@ -27,16 +47,14 @@ def get_tenant_config():
     if not tenant:
         return jsonify({'error': 'Tenant not found'}), 404
     
-    config = {
-        'position_mode': tenant.position_mode,
-        'team_name_1': tenant.team_name_1,
-        'team_name_2': tenant.team_name_2,
-        'team_color_1': tenant.team_color_1,
-        'team_color_2': tenant.team_color_2,
-        'assignment_mode': tenant.assignment_mode
-    }
+    cache_key = tenant_config_key(tenant.id)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return current_app.response_class(cached, mimetype='application/json')
     
-    return jsonify({'config': config})
+    body = current_app.json.dumps({'config': tenant_config_to_dict(tenant)})
+    cache.set(cache_key, body)
+    return current_app.response_class(body, mimetype='application/json')
 
 @tenants_bp.route('/config', methods=['PUT'])
 @tenant_admin_required
@@ -47,41 +65,42 @@ def update_tenant_config():
         return jsonify({'error': 'Tenant not found'}), 404
     
     data = request.get_json()
+    updates = {}
     
     # Validate position_mode
     if 'position_mode' in data:
         if data['position_mode'] not in ['three_position', 'two_position']:
             return jsonify({'error': 'Invalid position_mode'}), 400
-        tenant.position_mode = data['position_mode']
+        updates['position_mode'] = data['position_mode']
     
     # Validate assignment_mode
     if 'assignment_mode' in data:
         if data['assignment_mode'] not in ['manual', 'automatic']:
             return jsonify({'error': 'Invalid assignment_mode'}), 400
-        tenant.assignment_mode = data['assignment_mode']
+        updates['assignment_mode'] = data['assignment_mode']
     
     # Update team names and colors
     if 'team_name_1' in data:
-        tenant.team_name_1 = data['team_name_1'][:50]  # Limit length
+        updates['team_name_1'] = data['team_name_1'][:50]  # Limit length
     if 'team_name_2' in data:
-        tenant.team_name_2 = data['team_name_2'][:50]
+        updates['team_name_2'] = data['team_name_2'][:50]
     if 'team_color_1' in data:
-        tenant.team_color_1 = data['team_color_1'][:20]
+        updates['team_color_1'] = data['team_color_1'][:20]
     if 'team_color_2' in data:
-        tenant.team_color_2 = data['team_color_2'][:20]
+        updates['team_color_2'] = data['team_color_2'][:20]
+    
+    # Skip the write transaction entirely when the payload changes nothing
+    changed = {field: value for field, value in updates.items() if getattr(tenant, field) != value}
     
     try:
-        db.session.commit()
+        if changed:
+            for field, value in changed.items():
+                setattr(tenant, field, value)
+            db.session.commit()
+            invalidate_tenant_config(tenant.id)
         return jsonify({
             'message': 'Tenant configuration updated successfully',
-            'config': {
-                'position_mode': tenant.position_mode,
-                'team_name_1': tenant.team_name_1,
-                'team_name_2': tenant.team_name_2,
-                'team_color_1': tenant.team_color_1,
-                'team_color_2': tenant.team_color_2,
-                'assignment_mode': tenant.assignment_mode
-            }
+            'config': tenant_config_to_dict(tenant)
         })
     except Exception as e:
         db.session.rollback()
@@ -107,10 +126,11 @@ def register_tenant():
     slug = Tenant.generate_slug(name)
     
     # Check for existing tenant with same slug or subdomain
-    existing = Tenant.query.filter(
+    # Only the conflicting columns are needed, not a full Tenant row
+    existing = db.session.execute(db.select(Tenant.slug, Tenant.subdomain).where(
         (Tenant.slug == slug) | 
         (Tenant.subdomain == subdomain if subdomain else False)
-    ).first()
+    ).limit(1)).first()
     
     if existing:
         if existing.slug == slug:
@@ -152,8 +172,8 @@ def check_availability():
     # Check name/slug availability
     if 'name' in data:
         slug = Tenant.generate_slug(data['name'])
-        existing = Tenant.query.filter(Tenant.slug == slug).first()
-        results['name_available'] = existing is None
+        name_taken = db.session.execute(SLUG_TAKEN_STMT, {'slug': slug}).scalar()
+        results['name_available'] = not name_taken
         results['generated_slug'] = slug
     
     # Check subdomain availability
@@ -164,9 +184,9 @@ def check_availability():
                 results['subdomain_valid'] = False
                 results['subdomain_available'] = False
             else:
-                existing = Tenant.query.filter(Tenant.subdomain == subdomain).first()
+                subdomain_taken = db.session.execute(SUBDOMAIN_TAKEN_STMT, {'subdomain': subdomain}).scalar()
                 results['subdomain_valid'] = True
-                results['subdomain_available'] = existing is None
+                results['subdomain_available'] = not subdomain_taken
         else:
             results['subdomain_valid'] = True
             results['subdomain_available'] = True
@@ -20,7 +20,8 @@ app.config.update(
     SECRET_KEY='dev-secret-key-change-in-production',
     SQLALCHEMY_DATABASE_URI='sqlite:///hockey_dev.db',
     SQLALCHEMY_TRACK_MODIFICATIONS=False,
-    SQLALCHEMY_ECHO=True,
+    SQLALCHEMY_ENGINE_OPTIONS={'pool_pre_ping': True, 'pool_recycle': 1800},
+    SQLALCHEMY_ECHO=os.environ.get('SQLALCHEMY_ECHO', 'False').lower() in ['true', '1', 'yes'],
     WTF_CSRF_ENABLED=False,
     MAIL_SERVER='localhost',
     MAIL_PORT=1025,
@@ -43,7 +44,8 @@ login_manager.login_message = 'Please log in to access this page.'
 @login_manager.user_loader
 def load_user(user_id):
     from models.user import User
-    return User.query.get(int(user_id))
+    from utils.tenant_isolation import get_tenant_scoped
+    return get_tenant_scoped(User, int(user_id))
 
 # Initialize tenant middleware
 from utils.middleware import TenantMiddleware
@@ -59,10 +61,14 @@ app.register_blueprint(tenants_bp, url_prefix='/api/tenant')
 # Import models to register them
 from models import tenant, user
 
-# Create tables
-with app.app_context():
-    db.create_all()
-    print("Database tables created!")
+# Create tables only when asked (INIT_DB=1) or when serving via `python run_dev.py`;
+# the debug reloader executes this module twice, so skip its file-watcher process
+if os.environ.get('INIT_DB') == '1' or (
+    __name__ == '__main__' and os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+):
+    with app.app_context():
+        db.create_all()
+        print("Database tables created!")
 
 # Add a simple test route
 @app.route('/')
@@ -8,6 +8,22 @@ import os
 import sys
 from urllib.parse import urlparse
 
+# Required environment variables
+REQUIRED_VARS = [
+    'SECRET_KEY',
+    'DATABASE_URL',
+    'MAIL_SERVER',
+    'MAIL_DEFAULT_SENDER'
+]
+
+# Optional but recommended variables and their defaults
+OPTIONAL_VARS = {
+    'UPLOAD_FOLDER': 'uploads',
+    'MAX_CONTENT_LENGTH': '16777216',
+    'DEFAULT_LANGUAGE': 'en',
+    'SUPPORTED_LANGUAGES': 'en,fr'
+}
+
 def validate_database_url(url):
     """Validate database URL format"""
     try:
@@ -20,10 +36,10 @@ def validate_database_url(url):
     except Exception as e:
         return False, str(e)
 
-def validate_email_config():
+def validate_email_config(env):
     """Validate email configuration"""
-    mail_server = os.environ.get('MAIL_SERVER')
-    mail_port = os.environ.get('MAIL_PORT')
+    mail_server = env.get('MAIL_SERVER')
+    mail_port = env.get('MAIL_PORT')
     
     if not mail_server:
         return False, "MAIL_SERVER not set"
@@ -37,9 +53,9 @@ def validate_email_config():
     
     return True, "Valid"
 
-def validate_security_config():
+def validate_security_config(env):
     """Validate security configuration"""
-    secret_key = os.environ.get('SECRET_KEY')
+    secret_key = env.get('SECRET_KEY')
     
     if not secret_key:
         return False, "SECRET_KEY not set"
@@ -60,18 +76,13 @@ def main():
     errors = []
     warnings = []
     
-    # Required environment variables
-    required_vars = [
-        'SECRET_KEY',
-        'DATABASE_URL',
-        'MAIL_SERVER',
-        'MAIL_DEFAULT_SENDER'
-    ]
+    # Read every variable once up front; the validators work off this snapshot
+    env = {var: os.environ.get(var) for var in (*REQUIRED_VARS, *OPTIONAL_VARS, 'MAIL_PORT')}
     
     # Check required variables
     print("\n📋 Checking required environment variables...")
-    for var in required_vars:
-        value = os.environ.get(var)
+    for var in REQUIRED_VARS:
+        value = env[var]
         if not value:
             errors.append(f"❌ {var} is not set")
         else:
@@ -79,7 +90,7 @@ def main():
     
     # Validate database URL
     print("\n🗄️  Validating database configuration...")
-    db_url = os.environ.get('DATABASE_URL')
+    db_url = env['DATABASE_URL']
     if db_url:
         is_valid, message = validate_database_url(db_url)
         if is_valid:
@@ -89,7 +100,7 @@ def main():
     
     # Validate email configuration
     print("\n📧 Validating email configuration...")
-    is_valid, message = validate_email_config()
+    is_valid, message = validate_email_config(env)
     if is_valid:
         print(f"✅ Email config: {message}")
     else:
@@ -97,7 +108,7 @@ def main():
     
     # Validate security configuration
     print("\n🔒 Validating security configuration...")
-    is_valid, message = validate_security_config()
+    is_valid, message = validate_security_config(env)
     if is_valid:
         print(f"✅ Security config: {message}")
     else:
@@ -105,15 +116,8 @@ def main():
     
     # Check optional but recommended variables
     print("\n🔧 Checking optional configuration...")
-    optional_vars = {
-        'UPLOAD_FOLDER': 'uploads',
-        'MAX_CONTENT_LENGTH': '16777216',
-        'DEFAULT_LANGUAGE': 'en',
-        'SUPPORTED_LANGUAGES': 'en,fr'
-    }
-    
-    for var, default in optional_vars.items():
-        value = os.environ.get(var)
+    for var, default in OPTIONAL_VARS.items():
+        value = env[var]
         if not value:
             warnings.append(f"⚠️  {var} not set, will use default: {default}")
         else:
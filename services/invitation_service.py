@@ -4,6 +4,7 @@ Service for automated invitation management.
 from datetime import datetime
 from flask import current_app
 from app import db
+from utils.tenant_isolation import get_tenant_scoped
 from models.player import Player, PLAYER_TYPE_REGULAR
 from models.game import Game
 from models.invitation import Invitation
@@ -26,80 +27,93 @@ class InvitationService:
             dict: Summary of sent invitations
         """
         try:
-            game = Game.query.get(game_id)
+            game = get_tenant_scoped(Game, game_id)
             if not game:
                 return {'error': 'Game not found', 'sent': 0, 'failed': 0}
             
+            tenant_id = game.tenant_id
+            
+            # Players who already have an invitation for this game are excluded in SQL
+            already_invited = db.session.query(Invitation.id).filter(
+                Invitation.game_id == game_id,
+                Invitation.tenant_id == tenant_id,
+                Invitation.player_id == Player.id
+            ).exists()
+            
             # Get players to invite - CRITICAL: Only from same tenant
             if player_ids:
                 players = Player.query.filter(
                     Player.id.in_(player_ids),
-                    Player.tenant_id == game.tenant_id,
-                    Player.is_active == True
+                    Player.tenant_id == tenant_id,
+                    Player.is_active == True,
+                    ~already_invited
                 ).all()
             else:
                 # Get all regular active players from THIS TENANT ONLY
-                players = Player.query.filter_by(
-                    player_type=player_type,
-                    tenant_id=game.tenant_id,
-                    is_active=True
+                players = Player.query.filter(
+                    Player.player_type == player_type,
+                    Player.tenant_id == tenant_id,
+                    Player.is_active == True,
+                    ~already_invited
                 ).all()
             
             sent_count = 0
             failed_count = 0
             errors = []
             
+            # Build all new invitations first so they can be flushed together
+            pending = []
             for player in players:
-                try:
-                    # Check if invitation already exists for this tenant
-                    existing = Invitation.query.filter_by(
-                        game_id=game_id,
-                        player_id=player.id,
-                        tenant_id=game.tenant_id
-                    ).first()
-                    
-                    if existing:
-                        current_app.logger.info(f"Invitation already exists for player {player.name}")
-                        continue
-                    
-                    if not player.email:
-                        errors.append(f"Player {player.name} has no email")
-                        failed_count += 1
-                        continue
-                    
-                    # Check if player has email invitations enabled
-                    if not player.email_invitations:
-                        current_app.logger.info(f"Player {player.name} has email invitations disabled")
-                        continue
-                    
-                    # Create invitation
-                    invitation = Invitation(
-                        game_id=game_id,
-                        player_id=player.id,
-                        invitation_type=player_type,
-                        status='pending',
-                        tenant_id=game.tenant_id  # Add this line
-                    )
-                    
-                    db.session.add(invitation)
-                    db.session.flush()
-                    
-                    # Send email
-                    game_date = game.date.strftime('%A, %B %d, %Y')
-                    game_time = game.time.strftime('%I:%M %p')
-                    
-                    success = EmailService.send_game_invitation(
-                        player_email=player.email,
-                        player_name=player.name,
-                        game_date=game_date,
-                        game_time=game_time,
-                        venue=game.venue,
-                        game_id=game_id,
-                        language=player.preferred_language,
-                        tenant_subdomain=game.tenant.subdomain,
-                        invitation_token=invitation.token
-                    )
-                    
+                if not player.email:
+                    errors.append(f"Player {player.name} has no email")
+                    failed_count += 1
+                    continue
+                
+                # Check if player has email invitations enabled
+                if not player.email_invitations:
+                    current_app.logger.info(f"Player {player.name} has email invitations disabled")
+                    continue
+                
+                # Create invitation
+                invitation = Invitation(
+                    game_id=game_id,
+                    player_id=player.id,
+                    invitation_type=player_type,
+                    status='pending',
+                    tenant_id=tenant_id
+                )
+                pending.append((player, invitation))
+            
+            if pending:
+                db.session.add_all([invitation for _, invitation in pending])
+                db.session.flush()
+            
+            # Game details are the same for every invitation
+            game_date = game.date.strftime('%A, %B %d, %Y')
+            game_time = game.time.strftime('%I:%M %p')
+            venue = game.venue
+            tenant_subdomain = game.tenant.subdomain if pending else None
+            
+            # Sent in batches over reused SMTP connections on the shared email pool.
+            # Workers only send mail; invitation rows are updated here, on the
+            # request thread that owns the session.
+            if pending:
+                # Read player attributes here so worker threads never touch ORM state
+                email_jobs = [{
+                    'player_email': player.email,
+                    'player_name': player.name,
+                    'game_date': game_date,
+                    'game_time': game_time,
+                    'venue': venue,
+                    'game_id': game_id,
+                    'language': player.preferred_language,
+                    'tenant_subdomain': tenant_subdomain,
+                    'invitation_token': invitation.token
+                } for player, invitation in pending]
+                
+                results = EmailService.send_game_invitations_bulk(email_jobs)
+                
+                for (player, invitation), success in zip(pending, results):
                     if success:
                         invitation.mark_sent()
                         sent_count += 1
@@ -108,11 +122,6 @@ class InvitationService:
                         invitation.mark_bounced("Failed to send email")
                         failed_count += 1
                         errors.append(f"Failed to send email to {player.name}")
-                
-                except Exception as e:
-                    current_app.logger.error(f"Error sending invitation to {player.name}: {e}")
-                    failed_count += 1
-                    errors.append(f"Error with {player.name}: {str(e)}")
             
             db.session.commit()
             
@@ -6,6 +6,7 @@ from models.player import Player, POSITION_GOALTENDER
 from models.assignment import Assignment
 from models.game import Game
 from app import db
+from utils.tenant_isolation import get_tenant_scoped
 
 class TeamAssignmentService:
     """Service for balancing team assignments based on skill and position."""
@@ -35,7 +36,7 @@ class TeamAssignmentService:
             dict: Assignment results with team compositions
         """
         try:
-            game = Game.query.get(game_id)
+            game = get_tenant_scoped(Game, game_id)
             if not game:
                 return {'error': 'Game not found'}
             
@@ -44,13 +45,16 @@ class TeamAssignmentService:
             if not players:
                 return {'error': 'No players found'}
             
-            # Separate by position
-            goalies = [p for p in players if p.is_goaltender]
-            skaters = [p for p in players if not p.is_goaltender]
+            # Separate by position in a single pass
+            goalies, skaters = [], []
+            for player in players:
+                (goalies if player.is_goaltender else skaters).append(player)
             
-            # Sort by skill rating (highest first)
-            goalies.sort(key=lambda p: p.skill_rating or TeamAssignmentService.DEFAULT_RATING, reverse=True)
-            skaters.sort(key=lambda p: p.skill_rating or TeamAssignmentService.DEFAULT_RATING, reverse=True)
+            # Score each player once and sort by score (highest first); within a
+            # position the weight is constant, so this matches sorting by rating
+            score = TeamAssignmentService.calculate_player_score
+            scored_goalies = sorted(((score(p), p) for p in goalies), key=lambda t: t[0], reverse=True)
+            scored_skaters = sorted(((score(p), p) for p in skaters), key=lambda t: t[0], reverse=True)
             
             # Initialize teams
             team_1 = []
@@ -59,50 +63,38 @@ class TeamAssignmentService:
             team_2_score = 0
             
             # Assign goalies first (alternating)
-            for i, goalie in enumerate(goalies):
-                score = TeamAssignmentService.calculate_player_score(goalie)
+            for i, (goalie_score, goalie) in enumerate(scored_goalies):
                 if i % 2 == 0:
                     team_1.append(goalie)
-                    team_1_score += score
+                    team_1_score += goalie_score
                 else:
                     team_2.append(goalie)
-                    team_2_score += score
+                    team_2_score += goalie_score
             
             # Assign skaters using greedy algorithm (balance total score)
-            for skater in skaters:
-                score = TeamAssignmentService.calculate_player_score(skater)
+            for skater_score, skater in scored_skaters:
                 if team_1_score <= team_2_score:
                     team_1.append(skater)
-                    team_1_score += score
+                    team_1_score += skater_score
                 else:
                     team_2.append(skater)
-                    team_2_score += score
+                    team_2_score += skater_score
             
             # Delete existing assignments for this game
-            Assignment.query.filter_by(game_id=game_id).delete()
+            Assignment.query.filter_by(game_id=game_id).delete(synchronize_session=False)
             
-            # Create new assignments
-            for player in team_1:
-                assignment = Assignment(
-                    game_id=game_id,
-                    player_id=player.id,
-                    team_number=1,
-                    tenant_id=game.tenant_id
-                )
-                db.session.add(assignment)
+            # Create new assignments with a single multi-row INSERT
+            mappings = [
+                {'game_id': game_id, 'player_id': player.id, 'team_number': team_number, 'tenant_id': game.tenant_id}
+                for team_number, team in ((1, team_1), (2, team_2))
+                for player in team
+            ]
+            if mappings:
+                db.session.execute(db.insert(Assignment), mappings)
             
-            for player in team_2:
-                assignment = Assignment(
-                    game_id=game_id,
-                    player_id=player.id,
-                    team_number=2,
-                    tenant_id=game.tenant_id
-                )
-                db.session.add(assignment)
-            
-            db.session.commit()
-            
-            return {
+            # Serialize while the players are still loaded; commit expires them and
+            # to_dict() afterwards would reload each player with its own SELECT
+            result = {
                 'success': True,
                 'team_1': {
                     'players': [p.to_dict() for p in team_1],
@@ -117,6 +109,10 @@ class TeamAssignmentService:
                 'balance_difference': abs(team_1_score - team_2_score)
             }
             
+            db.session.commit()
+            
+            return result
+            
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f"Error in auto_assign_teams: {e}")
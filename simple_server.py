@@ -6,9 +6,9 @@ import os
 from flask import Flask, request, jsonify, g
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from flask_mail import Mail
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from functools import lru_cache
 import secrets
 import re
 
@@ -24,12 +24,24 @@ app.config.update(
     MAIL_PORT=1025,
     MAIL_USE_TLS=False,
     MAIL_DEFAULT_SENDER='noreply@hockey-app.local',
+    # werkzeug method string; scrypt and pbkdf2 both run in hashlib's C code,
+    # the work factor is what sets per-registration cost
+    PASSWORD_HASH_METHOD=os.environ.get('PASSWORD_HASH_METHOD', 'scrypt'),
 )
 
+# Serialize JSON responses with orjson when it is installed
+from utils.json_provider import init_json_provider
+init_json_provider(app)
+
 # Initialize extensions
 db = SQLAlchemy(app)
 login_manager = LoginManager(app)
-mail = Mail(app)
+
+@lru_cache(maxsize=None)
+def get_mail():
+    # No endpoint here sends mail yet; import flask_mail only when one does
+    from flask_mail import Mail
+    return Mail(app)
 
 # Configure login manager
 login_manager.login_view = 'login'
@@ -60,7 +72,7 @@ class User(db.Model):
     role = db.Column(db.String(20), default='user')
     is_active = db.Column(db.Boolean, default=True)
     is_verified = db.Column(db.Boolean, default=False)
-    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenants.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime)
     
@@ -68,7 +80,9 @@ class User(db.Model):
     __table_args__ = (db.UniqueConstraint('email', 'tenant_id', name='unique_email_per_tenant'),)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(
+            password, method=app.config['PASSWORD_HASH_METHOD']
+        )
     
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
@@ -93,26 +107,53 @@ class User(db.Model):
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return db.session.get(User, int(user_id))
 
 # Utility functions
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 def is_valid_email(email):
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return EMAIL_PATTERN.match(email) is not None
 
 def is_strong_password(password):
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
-    if not re.search(r'[A-Z]', password):
+    
+    # Single pass over the password instead of one regex scan per rule
+    has_upper = has_lower = has_digit = False
+    for char in password:
+        if 'A' <= char <= 'Z':
+            has_upper = True
+        elif 'a' <= char <= 'z':
+            has_lower = True
+        elif char.isdecimal():
+            has_digit = True
+        if has_upper and has_lower and has_digit:
+            break
+    
+    if not has_upper:
         return False, "Password must contain at least one uppercase letter"
-    if not re.search(r'[a-z]', password):
+    if not has_lower:
         return False, "Password must contain at least one lowercase letter"
-    if not re.search(r'\d', password):
+    if not has_digit:
         return False, "Password must contain at least one number"
     return True, "Password is strong"
 
+# subdomain -> tenant id, so auth requests can load the tenant by primary key
+_tenant_cache = {}
+
+def clear_tenant_cache():
+    _tenant_cache.clear()
+
 def get_or_create_tenant(subdomain='demo'):
     """Get or create a demo tenant for testing."""
+    tenant_id = _tenant_cache.get(subdomain)
+    if tenant_id is not None:
+        tenant = db.session.get(Tenant, tenant_id)
+        if tenant:
+            return tenant
+        _tenant_cache.pop(subdomain, None)
+    
     tenant = Tenant.query.filter_by(subdomain=subdomain).first()
     if not tenant:
         tenant = Tenant(
@@ -123,6 +164,7 @@ def get_or_create_tenant(subdomain='demo'):
         )
         db.session.add(tenant)
         db.session.commit()
+    _tenant_cache[subdomain] = tenant.id
     return tenant
 
 # Routes
@@ -177,7 +219,8 @@ def register():
         return jsonify({'error': 'User with this email already exists'}), 409
     
     # Check if this is the first user (becomes admin)
-    is_first_user = User.query.filter_by(tenant_id=tenant.id).count() == 0
+    # EXISTS stops at the first row instead of counting the whole tenant
+    is_first_user = not db.session.query(User.query.filter_by(tenant_id=tenant.id).exists()).scalar()
     
     # Create user
     user = User(
@@ -236,10 +279,14 @@ def login():
     
     # Log in user
     login_user(user)
-    user.last_login = datetime.utcnow()
-    db.session.commit()
+    # Narrow UPDATE for last_login instead of flushing the dirty User row
+    db.session.execute(
+        db.update(User).where(User.id == user.id).values(last_login=datetime.utcnow())
+    )
     
-    return jsonify({
+    # Build the payload before committing: commit expires user/tenant and
+    # reading them afterwards would reload both rows
+    payload = {
         'message': 'Login successful',
         'user': {
             'id': user.id,
@@ -253,7 +300,10 @@ def login():
             'name': tenant.name,
             'subdomain': tenant.subdomain
         }
-    }), 200
+    }
+    db.session.commit()
+    
+    return jsonify(payload), 200
 
 @app.route('/api/auth/logout', methods=['POST'])
 @login_required
@@ -282,25 +332,32 @@ def profile():
 
 @app.route('/api/tenants')
 def list_tenants():
-    tenants = Tenant.query.filter_by(is_active=True).all()
+    # One grouped query instead of lazy-loading users for every tenant
+    rows = db.session.query(Tenant, db.func.count(User.id)).outerjoin(User).filter(
+        Tenant.is_active == True
+    ).group_by(Tenant.id).all()
     return jsonify({
         'tenants': [{
             'id': t.id,
             'name': t.name,
             'subdomain': t.subdomain,
-            'user_count': len(t.users)
-        } for t in tenants]
+            'user_count': user_count
+        } for t, user_count in rows]
     })
 
+@app.cli.command('init-db')
+def init_db():
+    """Create tables and the demo tenant (run once: flask --app simple_server init-db)."""
+    db.create_all()
+    print("✅ Database tables created!")
+    
+    # Create demo tenant if it doesn't exist
+    demo_tenant = get_or_create_tenant('demo')
+    print(f"✅ Demo tenant ready: {demo_tenant.name}")
+
 if __name__ == '__main__':
-    # Create tables
-    with app.app_context():
-        db.create_all()
-        print("✅ Database tables created!")
-        
-        # Create demo tenant if it doesn't exist
-        demo_tenant = get_or_create_tenant('demo')
-        print(f"✅ Demo tenant ready: {demo_tenant.name}")
+    # Tables and the demo tenant are created by the init-db command, not on every start
+    print("\n💡 First run? Initialize the database with: flask --app simple_server init-db")
     
     print("\n🚀 Hockey Pickup Manager - Authentication Test Server")
     print("=" * 50)
@@ -0,0 +1,118 @@
+"""
+Shared test fixtures.
+
+The app and its schema are created once per session; each test runs inside an
+outer transaction that is rolled back afterwards, so commits made by the code
+under test never leak into the next test.
+"""
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session, sessionmaker
+from flask_sqlalchemy.session import Session as FlaskSession
+from app import create_app, db
+from models.tenant import Tenant
+from models.user import User
+
+class _ConnectionBoundSession(FlaskSession):
+    """Session that always uses the test's connection instead of resolving an engine."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        return self.bind
+
+def _enable_sqlite_savepoints(engine):
+    """Let SQLAlchemy emit BEGIN itself so SAVEPOINTs nest inside the test transaction.
+
+    pysqlite otherwise manages transactions on its own and a RELEASE of the
+    outermost savepoint would commit.
+    """
+    @event.listens_for(engine, 'connect')
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def emit_begin(connection):
+        connection.exec_driver_sql('BEGIN')
+
+def create_test_app():
+    """Create a 'testing' app whose engine supports nested savepoints."""
+    app = create_app('testing')
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            _enable_sqlite_savepoints(db.engine)
+    return app
+
+@pytest.fixture(scope='session')
+def app():
+    """Create the test app and schema once for the whole session.
+
+    Under pytest-xdist each worker is its own process with its own in-memory
+    database, so workers never share rows or schema. CI distributes with
+    --dist loadscope so a module's seeded rows are inserted on one worker only.
+    """
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture(autouse=True)
+def app_context(app):
+    """Run every test in its own app context so nothing cached on g leaks between tests."""
+    with app.app_context():
+        yield
+
+@pytest.fixture
+def db_session(app):
+    """Bind db.session to a connection-level transaction that is rolled back after the test."""
+    connection = db.engine.connect()
+    transaction = connection.begin()
+
+    # Session commits only release a SAVEPOINT inside the outer transaction
+    session = scoped_session(sessionmaker(
+        class_=_ConnectionBoundSession,
+        db=db,
+        bind=connection,
+        join_transaction_mode='create_savepoint',
+        expire_on_commit=False,
+    ))
+    original_session = db.session
+    db.session = session
+
+    yield session
+
+    session.remove()
+    db.session = original_session
+    transaction.rollback()
+    connection.close()
+
+@pytest.fixture(scope='module')
+def sample_tenant_id(app):
+    """Insert the sample tenant once per module; tests see it inside their own transaction."""
+    tenant = Tenant(
+        name="Test Hockey Club",
+        slug="test-hockey-club",
+        subdomain="testhockey",
+        is_active=True
+    )
+    db.session.add(tenant)
+    db.session.commit()
+    tenant_id = tenant.id
+    db.session.remove()  # release the connection before tests open their own transactions
+    yield tenant_id
+    db.session.execute(db.delete(Tenant).where(Tenant.id == tenant_id))
+    db.session.commit()
+
+@pytest.fixture
+def sample_tenant(db_session, sample_tenant_id):
+    """Sample tenant loaded into the test's session."""
+    return db_session.get(Tenant, sample_tenant_id)
+
+@pytest.fixture(scope='module')
+def sample_password_hash(app):
+    """Hash of the sample password, computed once per module for the users it creates."""
+    return User.hash_password("TestPassword123")
+
+@pytest.fixture
+def client(app, db_session):
+    """Create test client."""
+    return app.test_client()
@@ -0,0 +1,34 @@
+"""
+Tests for the tenant data cache.
+"""
+import pytest
+from flask import Flask
+from utils.cache import TenantCache, tenant_config_key, team_config_key
+
+@pytest.fixture
+def cache():
+    """Create an in-process cache (no REDIS_URL configured)."""
+    app = Flask(__name__)
+    app.config['CACHE_DEFAULT_TIMEOUT'] = 60
+    return TenantCache(app)
+
+class TestTenantCache:
+    """Test in-process cache behaviour."""
+    
+    def test_set_and_get(self, cache):
+        """Test that stored values are returned until invalidated."""
+        cache.set('tenant:1:config', '{"config": {}}')
+        assert cache.get('tenant:1:config') == '{"config": {}}'
+        
+        cache.delete('tenant:1:config')
+        assert cache.get('tenant:1:config') is None
+    
+    def test_expired_entries_are_misses(self, cache):
+        """Test that entries past their timeout are dropped."""
+        cache.set('tenant:1:config', 'value', timeout=-1)
+        assert cache.get('tenant:1:config') is None
+    
+    def test_config_keys_are_tenant_scoped(self):
+        """Test that cache keys never collide across tenants."""
+        assert tenant_config_key(1) != tenant_config_key(2)
+        assert tenant_config_key(1) != team_config_key(1)
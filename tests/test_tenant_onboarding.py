@@ -2,10 +2,9 @@
 Tests for tenant onboarding and registration flow.
 """
 import pytest
-from app import create_app, db
+from app import db
 from models.tenant import Tenant
 from models.user import User
-from routes.tenant_onboarding import onboarding_bp
 from utils.onboarding_helpers import (
     validate_subdomain_format, 
     suggest_subdomains,
@@ -13,21 +12,9 @@ from utils.onboarding_helpers import (
     calculate_setup_progress
 )
 
-@pytest.fixture
-def app():
-    """Create test app with onboarding routes."""
-    app = create_app('testing')
-    app.register_blueprint(onboarding_bp, url_prefix='/api/onboarding')
-    
-    with app.app_context():
-        db.create_all()
-        yield app
-        db.drop_all()
-
-@pytest.fixture
-def client(app):
-    """Create test client."""
-    return app.test_client()
+# Every test runs inside a rolled-back transaction on the shared app
+# (create_app already registers onboarding_bp under /api/onboarding)
+pytestmark = pytest.mark.usefixtures('db_session')
 
 class TestTenantRegistration:
     """Test tenant registration functionality."""
@@ -71,6 +58,44 @@ class TestTenantRegistration:
         assert 'already taken' in result['subdomain']['message']
         assert len(result['subdomain']['suggestions']) > 0
     
+    def test_check_availability_bulk(self, client):
+        """Test checking several names and subdomains in one request."""
+        tenant = Tenant(
+            name="Existing Club",
+            slug="existing-club",
+            subdomain="existing",
+            is_active=True
+        )
+        db.session.add(tenant)
+        db.session.commit()
+        
+        data = {
+            'organization_names': ['existing club', 'Fresh Club', 'x'],
+            'subdomains': ['existing', 'fresh', 'bad-']
+        }
+        
+        response = client.post('/api/onboarding/check-availability-bulk', json=data)
+        assert response.status_code == 200
+        
+        result = response.get_json()
+        names = {r['value']: r for r in result['organization_names']}
+        subdomains = {r['value']: r for r in result['subdomains']}
+        
+        assert names['existing club']['available'] is False
+        assert 'already exists' in names['existing club']['message']
+        assert names['Fresh Club']['available'] is True
+        assert names['x']['available'] is False
+        
+        assert subdomains['existing']['available'] is False
+        assert 'already taken' in subdomains['existing']['message']
+        assert subdomains['fresh']['available'] is True
+        assert subdomains['bad-']['available'] is False
+    
+    def test_check_availability_bulk_rejects_non_lists(self, client):
+        """Test that the bulk check requires lists."""
+        response = client.post('/api/onboarding/check-availability-bulk', json={'subdomains': 'existing'})
+        assert response.status_code == 400
+    
     def test_check_availability_invalid_subdomain(self, client):
         """Test availability check with invalid subdomain format."""
         data = {
@@ -173,11 +198,28 @@ class TestTenantRegistration:
         
         result = response.get_json()
         assert len(result['errors']) > 0
+    
+    def test_register_tenant_non_string_fields(self, client):
+        """Test that non-string fields are reported as validation errors, not server errors."""
+        data = {
+            'organization_name': 'New Hockey Club',
+            'subdomain': 123,
+            'admin_email': ['admin@test.com'],
+            'admin_password': None,
+            'admin_first_name': 'Admin',
+            'admin_last_name': 'User'
+        }
+        
+        response = client.post('/api/onboarding/register', json=data)
+        assert response.status_code == 400
+        
+        result = response.get_json()
+        assert "Subdomain is required" in result['errors']
 
 class TestOnboardingStatus:
     """Test onboarding status tracking."""
     
-    def test_get_onboarding_status_new_tenant(self, client):
+    def test_get_onboarding_status_new_tenant(self, client, sample_password_hash):
         """Test onboarding status for new tenant."""
         # Create tenant with admin
         tenant = Tenant(
@@ -197,7 +239,7 @@ class TestOnboardingStatus:
             is_verified=True,
             tenant_id=tenant.id
         )
-        admin.set_password("password123")
+        admin.password_hash = sample_password_hash
         db.session.add(admin)
         db.session.commit()
         
@@ -253,70 +295,102 @@ class TestOnboardingHelpers:
     
     def test_generate_onboarding_checklist(self, app):
         """Test onboarding checklist generation."""
-        with app.app_context():
-            # Create test tenant
-            tenant = Tenant(
-                name="Test Club",
-                slug="test-club",
-                subdomain="testclub",
-                is_active=True
-            )
-            db.session.add(tenant)
-            db.session.flush()
-            
-            checklist = generate_onboarding_checklist(tenant.id)
-            
-            assert 'checklist' in checklist
-            assert 'completion_percentage' in checklist
-            assert len(checklist['checklist']) > 0
-            
-            # All items should have required fields
-            for item in checklist['checklist']:
-                assert 'id' in item
-                assert 'title' in item
-                assert 'completed' in item
-                assert 'required' in item
+        # Create test tenant
+        tenant = Tenant(
+            name="Test Club",
+            slug="test-club",
+            subdomain="testclub",
+            is_active=True
+        )
+        db.session.add(tenant)
+        db.session.flush()
+        
+        checklist = generate_onboarding_checklist(tenant.id)
+        
+        assert 'checklist' in checklist
+        assert 'completion_percentage' in checklist
+        assert len(checklist['checklist']) > 0
+        
+        # All items should have required fields
+        for item in checklist['checklist']:
+            assert 'id' in item
+            assert 'title' in item
+            assert 'completed' in item
+            assert 'required' in item
     
-    def test_calculate_setup_progress(self, app):
+    def test_calculate_setup_progress(self, app, sample_password_hash):
         """Test setup progress calculation."""
-        with app.app_context():
-            # Create test tenant with admin
-            tenant = Tenant(
-                name="Test Club",
-                slug="test-club", 
-                subdomain="testclub",
-                is_active=True
-            )
-            db.session.add(tenant)
-            db.session.flush()
-            
-            admin = User(
-                email="admin@test.com",
-                first_name="Admin",
-                last_name="User",
-                role="admin",
-                tenant_id=tenant.id
-            )
-            admin.set_password("password123")
-            db.session.add(admin)
-            db.session.commit()
-            
-            progress = calculate_setup_progress(tenant.id)
-            
-            assert 'overall_percentage' in progress
-            assert 'categories' in progress
-            assert progress['overall_percentage'] > 0  # Should have some progress with admin user
-            
-            # Check category structure
-            for category in progress['categories'].values():
-                assert 'name' in category
-                assert 'percentage' in category
-                assert 'items' in category
+        # Create test tenant with admin
+        tenant = Tenant(
+            name="Test Club",
+            slug="test-club", 
+            subdomain="testclub",
+            is_active=True
+        )
+        db.session.add(tenant)
+        db.session.flush()
+        
+        admin = User(
+            email="admin@test.com",
+            first_name="Admin",
+            last_name="User",
+            role="admin",
+            tenant_id=tenant.id
+        )
+        admin.password_hash = sample_password_hash
+        db.session.add(admin)
+        db.session.commit()
+        
+        progress = calculate_setup_progress(tenant.id)
+        
+        assert 'overall_percentage' in progress
+        assert 'categories' in progress
+        assert progress['overall_percentage'] > 0  # Should have some progress with admin user
+        
+        # Check category structure
+        for category in progress['categories'].values():
+            assert 'name' in category
+            assert 'percentage' in category
+            assert 'items' in category
+
+class TestOnboardingValidators:
+    """Test registration field validators."""
+    
+    def test_is_strong_password(self):
+        """Test each password rule reports its own message."""
+        from routes.tenant_onboarding import is_strong_password
+        
+        assert is_strong_password("SecurePass123")[0] is True
+        assert "at least 8 characters" in is_strong_password("Ab1")[1]
+        assert "uppercase letter" in is_strong_password("securepass123")[1]
+        assert "lowercase letter" in is_strong_password("SECUREPASS123")[1]
+        assert "number" in is_strong_password("SecurePassword")[1]
+    
+    def test_validate_organization_name(self):
+        """Test organization name validation."""
+        from routes.tenant_onboarding import validate_organization_name
+        
+        assert validate_organization_name("St. Mary's Hockey-Club")[0] is True
+        assert validate_organization_name("  ab  ")[0] is False
+        assert validate_organization_name(None)[0] is False
+        assert validate_organization_name("Bad <Name>")[0] is False
+    
+    def test_validate_subdomain(self):
+        """Test subdomain character, hyphen placement and reserved-name rules."""
+        from utils.tenant import validate_subdomain
+        
+        assert validate_subdomain("my-club-2")[0] is True
+        assert validate_subdomain("-club")[0] is False
+        assert validate_subdomain("club-")[0] is False
+        assert validate_subdomain("My-Club")[0] is False
+        assert validate_subdomain("club_one")[0] is False
+        assert validate_subdomain("club\n")[0] is False
+        assert "reserved" in validate_subdomain("admin")[1]
 
 class TestWelcomeEmail:
     """Test welcome email functionality."""
     
-    def test_send_welcome_email_success(self, client):
+    def test_send_welcome_email_success(self, client, sample_password_hash):
         """Test sending welcome email."""
         # Create tenant with admin
         tenant = Tenant(
@@ -335,7 +409,7 @@ class TestWelcomeEmail:
             role="admin",
             tenant_id=tenant.id
         )
-        admin.set_password("password123")
+        admin.password_hash = sample_password_hash
         db.session.add(admin)
         db.session.commit()
         
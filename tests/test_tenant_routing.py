@@ -2,57 +2,39 @@
 Tests for tenant routing and multi-tenant functionality.
 """
 import pytest
-from app import create_app, db
+from app import db
 from models.tenant import Tenant
 from utils.tenant import get_current_tenant
 
-@pytest.fixture
-def app():
-    """Create test app with testing configuration."""
-    app = create_app('testing')
-    with app.app_context():
-        db.create_all()
-        yield app
-        db.drop_all()
+# Every test runs inside a rolled-back transaction on the shared app
+pytestmark = pytest.mark.usefixtures('db_session')
 
-@pytest.fixture
-def client(app):
-    """Create test client."""
-    return app.test_client()
-
-@pytest.fixture
-def sample_tenant(app):
-    """Create a sample tenant for testing."""
-    with app.app_context():
-        tenant = Tenant(
-            name="Test Hockey Club",
-            slug="test-hockey-club",
-            subdomain="testhockey",
-            is_active=True
-        )
-        db.session.add(tenant)
-        db.session.commit()
-        return tenant
+@pytest.fixture(autouse=True)
+def restore_app_config(app):
+    """Undo config changes made by a test; the app is shared across the session."""
+    saved = dict(app.config)
+    yield
+    app.config.clear()
+    app.config.update(saved)
 
 class TestTenantModel:
     """Test tenant model functionality."""
     
     def test_tenant_creation(self, app):
         """Test creating a new tenant."""
-        with app.app_context():
-            tenant = Tenant(
-                name="Sample Club",
-                slug="sample-club",
-                subdomain="sample"
-            )
-            db.session.add(tenant)
-            db.session.commit()
-            
-            assert tenant.id is not None
-            assert tenant.name == "Sample Club"
-            assert tenant.slug == "sample-club"
-            assert tenant.subdomain == "sample"
-            assert tenant.is_active is True
+        tenant = Tenant(
+            name="Sample Club",
+            slug="sample-club",
+            subdomain="sample"
+        )
+        db.session.add(tenant)
+        db.session.commit()
+        
+        assert tenant.id is not None
+        assert tenant.name == "Sample Club"
+        assert tenant.slug == "sample-club"
+        assert tenant.subdomain == "sample"
+        assert tenant.is_active is True
     
     def test_slug_generation(self):
         """Test automatic slug generation."""
@@ -77,22 +59,36 @@ class TestTenantModel:
         assert Tenant.is_valid_subdomain("TEST") is False  # Uppercase
         assert Tenant.is_valid_subdomain("test_club") is False  # Underscore
     
+    def test_to_dict_does_not_lazy_load_relationships(self, app, sample_tenant):
+        """Test that serializing a tenant touches only its own columns."""
+        from sqlalchemy.orm import raiseload
+        
+        with app.test_request_context('/'):
+            db.session.expire_all()
+            tenant = db.session.query(Tenant).options(raiseload('*')).filter(
+                Tenant.id == sample_tenant.id
+            ).one()
+            
+            # Would raise if to_dict() touched users/players/games
+            data = tenant.to_dict()
+            assert data['id'] == sample_tenant.id
+            assert data['subdomain'] == 'testhockey'
+    
     def test_tenant_url_generation(self, app, sample_tenant):
         """Test tenant URL generation."""
-        with app.app_context():
-            # Test subdomain URL
-            app.config['TENANT_URL_SUBDOMAIN_ENABLED'] = True
-            app.config['SERVER_NAME'] = 'example.com'
-            
-            url = sample_tenant.get_url()
-            assert url == "http://testhockey.example.com"
-            
-            # Test path-based URL
-            app.config['TENANT_URL_SUBDOMAIN_ENABLED'] = False
-            app.config['TENANT_URL_PATH_ENABLED'] = True
-            
-            url = sample_tenant.get_url()
-            assert url == "http://example.com/test-hockey-club"
+        # Test subdomain URL
+        app.config['TENANT_URL_SUBDOMAIN_ENABLED'] = True
+        app.config['SERVER_NAME'] = 'example.com'
+        
+        url = sample_tenant.get_url()
+        assert url == "http://testhockey.example.com"
+        
+        # Test path-based URL
+        app.config['TENANT_URL_SUBDOMAIN_ENABLED'] = False
+        app.config['TENANT_URL_PATH_ENABLED'] = True
+        
+        url = sample_tenant.get_url()
+        assert url == "http://example.com/test-hockey-club"
 
 class TestTenantRouting:
     """Test tenant routing functionality."""
@@ -128,6 +124,77 @@ class TestTenantRouting:
             
             assert tenant is None
 
+    @pytest.mark.parametrize('host,expected', [
+        ('testhockey.localhost:5000', 'testhockey'),
+        ('TestHockey.Example.com', 'testhockey'),
+        ('www.example.com', None),
+        ('localhost:5000', None),
+    ])
+    def test_subdomain_from_host(self, host, expected):
+        """Test extracting the tenant subdomain from the Host header."""
+        from utils.tenant import _subdomain_from_host
+        assert _subdomain_from_host(host) == expected
+
+    def test_tenant_lookup_cached_per_request(self, app, sample_tenant):
+        """Test that the resolved tenant (or a miss) is memoized on g."""
+        # Each block pushes its own app context so g is fresh, as in a real request
+        with app.app_context(), app.test_request_context('/', base_url='http://testhockey.localhost:5000'):
+            from flask import g
+            from utils.tenant import get_current_tenant
+            tenant = get_current_tenant()
+            
+            assert g.current_tenant is tenant
+            assert get_current_tenant() is tenant
+        
+        with app.app_context(), app.test_request_context('/', base_url='http://nonexistent.localhost:5000'):
+            from flask import g
+            from utils.tenant import get_current_tenant
+            assert get_current_tenant() is None
+            assert 'current_tenant' in g
+            assert g.current_tenant is None
+
+    def test_tenant_id_cache_revalidates(self, app, sample_tenant):
+        """Test that cached subdomain lookups are dropped once the tenant no longer matches."""
+        from utils.tenant import _cached_tenant_id, invalidate_tenant_lookup
+        invalidate_tenant_lookup()
+
+        with app.app_context(), app.test_request_context('/', base_url='http://testhockey.localhost:5000'):
+            tenant_id = get_current_tenant().id
+            assert _cached_tenant_id('testhockey') == tenant_id
+
+            # Core UPDATE skips the ORM after_update invalidation, leaving a stale entry
+            db.session.execute(db.update(Tenant).where(Tenant.id == tenant_id).values(is_active=False))
+            db.session.commit()
+            assert _cached_tenant_id('testhockey') == tenant_id
+
+        with app.app_context(), app.test_request_context('/', base_url='http://testhockey.localhost:5000'):
+            assert get_current_tenant() is None
+            assert _cached_tenant_id('testhockey') is None
+
+    def test_tenant_id_shared_cache(self, app, sample_tenant):
+        """Test that the shared cache warms the local map and is dropped on tenant changes."""
+        from app import cache
+        from utils.cache import tenant_lookup_key
+        from utils.tenant import _cached_tenant_id, invalidate_tenant_lookup
+        invalidate_tenant_lookup('testhockey')
+
+        with app.app_context(), app.test_request_context('/', base_url='http://testhockey.localhost:5000'):
+            get_current_tenant()
+        assert cache.get(tenant_lookup_key('testhockey')) == str(sample_tenant.id)
+
+        # A process with a cold local map still resolves through the shared entry
+        invalidate_tenant_lookup()
+        with app.app_context(), app.test_request_context('/', base_url='http://testhockey.localhost:5000'):
+            assert get_current_tenant().id == sample_tenant.id
+        assert _cached_tenant_id('testhockey') == sample_tenant.id
+
+        # Leaving each pushed app context removed the session, so re-load first
+        tenant = db.session.get(Tenant, sample_tenant.id)
+        tenant.subdomain = 'renamed'
+        db.session.commit()
+        assert cache.get(tenant_lookup_key('testhockey')) is None
+        assert _cached_tenant_id('testhockey') is None
+
 class TestTenantAPI:
     """Test tenant API endpoints."""
     
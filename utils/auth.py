@@ -2,20 +2,40 @@
 Authentication utilities and decorators.
 """
 from functools import wraps
-from flask import jsonify
+from flask import current_app
 from flask_login import current_user
-from utils.tenant import get_current_tenant
+from utils.tenant import get_tenant_id
+
+def _encoded_error(message):
+    """JSON body for an error message, encoded once per app and message with the app's JSON provider."""
+    bodies = current_app.extensions.setdefault('error_response_bodies', {})
+    body = bodies.get(message)
+    if body is None:
+        # Same output as jsonify, including its trailing newline
+        body = bodies[message] = f"{current_app.json.dumps({'error': message})}\n".encode('utf-8')
+    return body
+
+def error_response(message, status):
+    """JSON error response for decorator rejections, without a per-call jsonify.
+    
+    A new response is built each time; after_request hooks (CORS, session)
+    modify headers, so a shared instance would leak them between requests.
+    """
+    return current_app.response_class(
+        _encoded_error(message), status=status, mimetype=current_app.json.mimetype
+    )
 
 def permission_required(permission):
     """Decorator to check if user has specific permission."""
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if not current_user.is_authenticated:
-                return jsonify({'error': 'Authentication required'}), 401
+            user = current_user._get_current_object()
+            if not user.is_authenticated:
+                return error_response('Authentication required', 401)
             
-            if not current_user.has_permission(permission):
-                return jsonify({'error': 'Insufficient permissions'}), 403
+            if not user.has_permission(permission):
+                return error_response('Insufficient permissions', 403)
             
             return f(*args, **kwargs)
         return decorated_function
@@ -25,11 +45,12 @@ def admin_required(f):
     """Decorator to require admin privileges."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated:
-            return jsonify({'error': 'Authentication required'}), 401
+        user = current_user._get_current_object()
+        if not user.is_authenticated:
+            return error_response('Authentication required', 401)
         
-        if not current_user.is_admin:
-            return jsonify({'error': 'Admin privileges required'}), 403
+        if not user.is_admin:
+            return error_response('Admin privileges required', 403)
         
         return f(*args, **kwargs)
     return decorated_function
@@ -38,11 +59,12 @@ def super_admin_required(f):
     """Decorator to require super admin privileges."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated:
-            return jsonify({'error': 'Authentication required'}), 401
+        user = current_user._get_current_object()
+        if not user.is_authenticated:
+            return error_response('Authentication required', 401)
         
-        if not current_user.is_super_admin:
-            return jsonify({'error': 'Super admin privileges required'}), 403
+        if not user.is_super_admin:
+            return error_response('Super admin privileges required', 403)
         
         return f(*args, **kwargs)
     return decorated_function
@@ -51,11 +73,12 @@ def verified_required(f):
     """Decorator to require email verification."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated:
-            return jsonify({'error': 'Authentication required'}), 401
+        user = current_user._get_current_object()
+        if not user.is_authenticated:
+            return error_response('Authentication required', 401)
         
-        if not current_user.is_verified:
-            return jsonify({'error': 'Email verification required'}), 403
+        if not user.is_verified:
+            return error_response('Email verification required', 403)
         
         return f(*args, **kwargs)
     return decorated_function
@@ -64,12 +87,14 @@ def same_tenant_required(f):
     """Decorator to ensure user belongs to current tenant."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated:
-            return jsonify({'error': 'Authentication required'}), 401
+        user = current_user._get_current_object()
+        if not user.is_authenticated:
+            return error_response('Authentication required', 401)
         
-        tenant = get_current_tenant()
-        if not tenant or current_user.tenant_id != tenant.id:
-            return jsonify({'error': 'Access denied'}), 403
+        # Tenant id memoized on g for the request
+        tenant_id = get_tenant_id()
+        if not tenant_id or user.tenant_id != tenant_id:
+            return error_response('Access denied', 403)
         
         return f(*args, **kwargs)
     return decorated_function
@@ -2,6 +2,7 @@
 Base model class with tenant isolation support.
 """
 from flask import g
+from sqlalchemy.orm import load_only
 from app import db
 from utils.tenant import get_tenant_id
 
@@ -20,6 +21,29 @@ class TenantMixin:
             return cls.query.filter(cls.tenant_id == tenant_id)
         return cls.query
     
+    @classmethod
+    def query_for_tenant_only(cls, *columns, tenant_id=None):
+        """Get a 2.0-style select filtered by tenant that loads only the given columns."""
+        if tenant_id is None:
+            tenant_id = get_tenant_id()
+        
+        stmt = db.select(cls)
+        if tenant_id:
+            stmt = stmt.where(cls.tenant_id == tenant_id)
+        if columns:
+            stmt = stmt.options(load_only(*columns))
+        return stmt
+    
+    @classmethod
+    def _settable_columns(cls):
+        """Mapped column attribute names, computed once per model on first use."""
+        # The table isn't mapped yet when subclasses are created, so build lazily
+        columns = cls.__dict__.get('_settable_column_keys')
+        if columns is None:
+            columns = frozenset(attr.key for attr in db.inspect(cls).column_attrs)
+            cls._settable_column_keys = columns
+        return columns
+    
     @classmethod
     def create_for_tenant(cls, **kwargs):
         """Create a new instance for the current tenant."""
@@ -28,21 +52,39 @@ class TenantMixin:
             kwargs['tenant_id'] = tenant_id
         return cls(**kwargs)
     
-    def save(self):
-        """Save the instance to database."""
+    @classmethod
+    def bulk_create_for_tenant(cls, rows, commit=True):
+        """Insert many rows for the current tenant with a single executemany INSERT."""
+        tenant_id = get_tenant_id()
+        if tenant_id:
+            rows = [{**row, 'tenant_id': tenant_id} for row in rows]
+        if rows:
+            db.session.execute(db.insert(cls), rows)
+        _finish(commit)
+    
+    def save(self, commit=True):
+        """Save the instance to database (flush only when commit is False)."""
         db.session.add(self)
-        db.session.commit()
+        _finish(commit)
         return self
     
-    def delete(self):
-        """Delete the instance from database."""
+    def delete(self, commit=True):
+        """Delete the instance from database (flush only when commit is False)."""
         db.session.delete(self)
-        db.session.commit()
+        _finish(commit)
     
-    def update(self, **kwargs):
-        """Update the instance with new values."""
+    def update(self, commit=True, **kwargs):
+        """Update mapped columns with new values (flush only when commit is False)."""
+        settable = self._settable_columns()
         for key, value in kwargs.items():
-            if hasattr(self, key):
+            if key in settable:
                 setattr(self, key, value)
-        db.session.commit()
+        _finish(commit)
         return self
+
+def _finish(commit):
+    """Commit, or just flush so the caller can batch more work into the same transaction."""
+    if commit:
+        db.session.commit()
+    else:
+        db.session.flush()
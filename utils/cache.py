@@ -0,0 +1,101 @@
+"""
+Shared cache for tenant-scoped data (Redis when configured, in-process otherwise).
+"""
+import logging
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # redis is optional; fall back to the in-process store
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+class TenantCache:
+    """Small string key/value cache with TTLs and explicit invalidation."""
+
+    def __init__(self, app=None):
+        self._redis = None
+        self._store = {}
+        self._lock = threading.Lock()
+        self.default_timeout = 300
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure the backend from REDIS_URL and register on the app."""
+        self.default_timeout = app.config.get('CACHE_DEFAULT_TIMEOUT', 300)
+        self._store = {}
+        self._redis = None
+
+        redis_url = app.config.get('REDIS_URL')
+        if redis_url and redis is not None:
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5)
+
+        app.extensions['tenant_cache'] = self
+
+    def get(self, key):
+        """Return the cached string for key, or None on a miss."""
+        if self._redis is not None:
+            try:
+                value = self._redis.get(key)
+                return value.decode('utf-8') if value is not None else None
+            except redis.RedisError as e:
+                logger.warning(f"Cache get failed for {key}: {e}")
+                return None
+
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            with self._lock:
+                self._store.pop(key, None)
+            return None
+        return value
+
+    def set(self, key, value, timeout=None):
+        """Store a string value for timeout seconds."""
+        timeout = timeout or self.default_timeout
+        if self._redis is not None:
+            try:
+                self._redis.setex(key, timeout, value)
+            except redis.RedisError as e:
+                logger.warning(f"Cache set failed for {key}: {e}")
+            return
+
+        with self._lock:
+            self._store[key] = (time.monotonic() + timeout, value)
+
+    def delete(self, *keys):
+        """Invalidate one or more keys."""
+        if not keys:
+            return
+        if self._redis is not None:
+            try:
+                self._redis.delete(*keys)
+            except redis.RedisError as e:
+                logger.warning(f"Cache delete failed for {keys}: {e}")
+            return
+
+        with self._lock:
+            for key in keys:
+                self._store.pop(key, None)
+
+def tenant_lookup_key(identifier):
+    """Cache key for the tenant id behind a slug/subdomain (tenant resolution)."""
+    return f'tenant:lookup:{identifier}'
+
+def tenant_config_key(tenant_id):
+    """Cache key for the tenant settings payload (/api/tenant/config)."""
+    return f'tenant:{tenant_id}:config'
+
+def team_config_key(tenant_id):
+    """Cache key for the team settings payload (/api/teams/config)."""
+    return f'tenant:{tenant_id}:team_config'
+
+def invalidate_tenant_config(tenant_id):
+    """Drop every cached configuration payload for a tenant."""
+    from app import cache
+    cache.delete(tenant_config_key(tenant_id), team_config_key(tenant_id))
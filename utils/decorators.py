@@ -2,8 +2,9 @@
 Custom decorators for multi-tenant application.
 """
 from functools import wraps
-from flask import g, jsonify, abort
-from utils.tenant import get_current_tenant, get_tenant_id, validate_tenant_access
+from flask import g, abort
+from utils.auth import error_response
+from utils.tenant import get_current_tenant, get_tenant_id
 
 def tenant_required(f):
     """Decorator to require tenant context for a route."""
@@ -12,7 +13,7 @@ def tenant_required(f):
         tenant = get_current_tenant()
         if not tenant:
             if hasattr(f, '__name__') and 'api' in f.__name__:
-                return jsonify({'error': 'Tenant context required'}), 400
+                return error_response('Tenant context required', 400)
             abort(404, description="Tenant not found")
         return f(*args, **kwargs)
     return decorated_function
@@ -23,19 +24,20 @@ def tenant_admin_required(f):
     def decorated_function(*args, **kwargs):
         from flask_login import current_user
         
-        # First check if tenant context exists
+        # First check if tenant context exists (memoized on g, so stacking
+        # this under tenant_required does not resolve the tenant twice)
         tenant = get_current_tenant()
         if not tenant:
-            return jsonify({'error': 'Tenant context required'}), 400
+            return error_response('Tenant context required', 400)
         
         # Check if user is authenticated
-        if not current_user.is_authenticated:
-            return jsonify({'error': 'Authentication required'}), 401
+        user = current_user._get_current_object()
+        if not user.is_authenticated:
+            return error_response('Authentication required', 401)
         
         # Check if user belongs to this tenant and is admin
-        if (current_user.tenant_id != tenant.id or 
-            current_user.role not in ['admin', 'super_admin']):
-            return jsonify({'error': 'Admin privileges required'}), 403
+        if user.tenant_id != tenant.id or not user.is_admin:
+            return error_response('Admin privileges required', 403)
         
         return f(*args, **kwargs)
     return decorated_function
@@ -47,7 +49,7 @@ def validate_tenant_resource(model_class):
         def decorated_function(*args, **kwargs):
             tenant_id = get_tenant_id()
             if not tenant_id:
-                return jsonify({'error': 'Tenant context required'}), 400
+                return error_response('Tenant context required', 400)
             
             # Get resource ID from kwargs or args
             resource_id = kwargs.get('id') or kwargs.get('resource_id')
@@ -55,9 +57,9 @@ def validate_tenant_resource(model_class):
                 resource_id = args[0]
             
             if resource_id:
-                # Query the resource and validate tenant access
-                resource = model_class.query.get_or_404(resource_id)
-                validate_tenant_access(resource)
+                # Filter by tenant in the query: another tenant's resource is a 404,
+                # indistinguishable from one that does not exist
+                resource = model_class.query_for_tenant(tenant_id).filter_by(id=resource_id).first_or_404()
                 
                 # Add resource to kwargs for the route function
                 kwargs['resource'] = resource
@@ -1,14 +1,116 @@
 """
 Email service for sending game invitations and notifications.
 """
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app, render_template
 from flask_mail import Message
 from app import mail
 from typing import List, Optional
+import threading
+
+# Concurrent SMTP sends per process
+EMAIL_WORKERS = 8
+
+# Messages sent over one SMTP connection before the next batch opens its own
+EMAIL_BATCH_SIZE = 50
+
+# Languages with a game invitation template
+INVITATION_LANGUAGES = ('en', 'fr')
+
+# Plain text game invitation (subject, body) by language, filled with str.format
+INVITATION_TEXT = {
+    'en': ("Game Invitation - {game_date}", """
+    Hello {player_name},
+
+    You are invited to the following game:
+
+    Date: {game_date}
+    Time: {game_time}
+    Venue: {venue}
+
+    Please confirm your availability:
+    Available: {confirm_url}
+    Not Available: {decline_url}
+
+    Thanks,
+    Hockey Pickup Manager
+            """),
+    'fr': ("Invitation au match - {game_date}", """
+    Bonjour {player_name},
+
+    Vous êtes invité(e) au match suivant :
+
+    Date : {game_date}
+    Heure : {game_time}
+    Lieu : {venue}
+
+    Veuillez confirmer votre disponibilité :
+    Disponible : {confirm_url}
+    Non disponible : {decline_url}
+
+    Merci,
+    Hockey Pickup Manager
+            """),
+}
+
+_email_executor = None
+_email_executor_lock = threading.Lock()
+
+def _get_email_executor():
+    """Return the process-wide email pool, created on first use (after any fork)."""
+    global _email_executor
+    with _email_executor_lock:
+        if _email_executor is None:
+            _email_executor = ThreadPoolExecutor(
+                max_workers=EMAIL_WORKERS, thread_name_prefix='email'
+            )
+        return _email_executor
+
+def _invitation_templates():
+    """Compiled game invitation templates for the current app, loaded once per app."""
+    templates = current_app.extensions.get('invitation_templates')
+    if templates is None:
+        templates = {
+            language: current_app.jinja_env.get_template(f'email/game_invitation_{language}.html')
+            for language in INVITATION_LANGUAGES
+        }
+        current_app.extensions['invitation_templates'] = templates
+    return templates
 
 class EmailService:
     """Service for sending emails to players."""
     
+    @staticmethod
+    def submit(send, *args, **kwargs):
+        """
+        Run an EmailService send method on the shared email pool.
+        
+        Args:
+            send: The send method to call (e.g. EmailService.send_game_invitation)
+            *args, **kwargs: Plain values only; ORM objects must not cross threads
+        
+        Returns:
+            Future resolving to the send method's result
+        """
+        app = current_app._get_current_object()
+        
+        def run():
+            with app.app_context():
+                return send(*args, **kwargs)
+        
+        return _get_email_executor().submit(run)
+    
+    @staticmethod
+    def build_message(subject: str, recipients: List[str], body: str, html: Optional[str] = None):
+        """Build a message from the configured default sender."""
+        return Message(
+            subject=subject,
+            recipients=recipients,
+            body=body,
+            html=html,
+            sender=current_app.config['MAIL_DEFAULT_SENDER']
+        )
+    
     @staticmethod
     def send_email(subject: str, recipients: List[str], body: str, html: Optional[str] = None):
         """
@@ -21,13 +123,7 @@ class EmailService:
             html: Optional HTML body
         """
         try:
-            msg = Message(
-                subject=subject,
-                recipients=recipients,
-                body=body,
-                html=html,
-                sender=current_app.config['MAIL_DEFAULT_SENDER']
-            )
+            msg = EmailService.build_message(subject, recipients, body, html)
             mail.send(msg)
             current_app.logger.info(f"Email sent successfully to {recipients}: {subject}")
             return True
@@ -57,6 +153,65 @@ class EmailService:
             is_reminder: Whether this is a reminder email
             has_responded: Whether the player has already responded
         """
+        subject, body, html = EmailService._game_invitation_content(
+            player_name, game_date, game_time, venue, game_id, language,
+            tenant_subdomain, invitation_token, is_reminder, has_responded
+        )
+        return EmailService.send_email(subject, [player_email], body, html)
+    
+    @staticmethod
+    def send_game_invitations_bulk(invitations: List[dict]):
+        """
+        Send many game invitations, reusing one SMTP connection per batch.
+        
+        Batches of EMAIL_BATCH_SIZE run concurrently on the shared email pool.
+        
+        Args:
+            invitations: send_game_invitation keyword arguments, one dict per email
+        
+        Returns:
+            List of booleans, one per invitation in order, True when sent
+        """
+        futures = [
+            EmailService.submit(
+                EmailService._send_game_invitation_batch,
+                invitations[start:start + EMAIL_BATCH_SIZE]
+            )
+            for start in range(0, len(invitations), EMAIL_BATCH_SIZE)
+        ]
+        return [sent for future in futures for sent in future.result()]
+    
+    @staticmethod
+    def _send_game_invitation_batch(invitations: List[dict]):
+        """Send a batch of game invitations over a single SMTP connection."""
+        results = []
+        try:
+            with mail.connect() as connection:
+                for invitation in invitations:
+                    invitation = dict(invitation)
+                    player_email = invitation.pop('player_email')
+                    try:
+                        subject, body, html = EmailService._game_invitation_content(**invitation)
+                        connection.send(EmailService.build_message(subject, [player_email], body, html))
+                        results.append(True)
+                    except Exception as e:
+                        current_app.logger.error(f"Failed to send invitation to {player_email}: {str(e)}")
+                        results.append(False)
+        except Exception as e:
+            current_app.logger.error(f"SMTP connection failed during invitation batch: {str(e)}")
+            current_app.logger.exception("Full traceback:")
+        
+        # Anything not attempted because the connection failed counts as unsent
+        results.extend([False] * (len(invitations) - len(results)))
+        current_app.logger.info(f"Invitation batch sent {sum(results)}/{len(invitations)} emails")
+        return results
+    
+    @staticmethod
+    def _game_invitation_content(player_name: str, game_date: str, game_time: str, venue: str,
+                                 game_id: int, language: str = 'en', tenant_subdomain: str = None,
+                                 invitation_token: str = None, is_reminder: bool = False,
+                                 has_responded: bool = False):
+        """Render the subject, plain text body and HTML body of a game invitation."""
         # Generate URLs for confirmation/decline
         base_url = current_app.config.get('FRONTEND_URL', 'http://localhost:3000')
         if tenant_subdomain:
@@ -75,12 +230,8 @@ class EmailService:
             decline_url = f"{base_url}/games/{game_id}/respond?status=unavailable"
             tenant_url = f"{base_url}/games/{game_id}"
     
-        # Select template based on language
-        template = f'email/game_invitation_{language}.html'
-    
         # Render HTML template
-        html = render_template(
-            template,
+        context = dict(
             player_name=player_name,
             game_date=game_date,
             game_time=game_time,
@@ -91,46 +242,26 @@ class EmailService:
             decline_url=decline_url,
             tenant_url=tenant_url
         )
+        if language in INVITATION_LANGUAGES and not current_app.jinja_env.auto_reload:
+            # Templates only use the variables passed here, so the compiled
+            # template is rendered directly, skipping lookup and context processors
+            html = _invitation_templates()[language].render(**context)
+        else:
+            html = render_template(f'email/game_invitation_{language}.html', **context)
     
         # Create plain text version
-        if language == 'fr':
-            subject = f"Invitation au match - {game_date}"
-            body = f"""
-    Bonjour {player_name},
-
-    Vous êtes invité(e) au match suivant :
-
-    Date : {game_date}
-    Heure : {game_time}
-    Lieu : {venue}
-
-    Veuillez confirmer votre disponibilité :
-    Disponible : {confirm_url}
-    Non disponible : {decline_url}
-
-    Merci,
-    Hockey Pickup Manager
-            """
-        else:
-            subject = f"Game Invitation - {game_date}"
-            body = f"""
-    Hello {player_name},
-
-    You are invited to the following game:
-
-    Date: {game_date}
-    Time: {game_time}
-    Venue: {venue}
-
-    Please confirm your availability:
-    Available: {confirm_url}
-    Not Available: {decline_url}
-
-    Thanks,
-    Hockey Pickup Manager
-            """
+        subject_template, body_template = INVITATION_TEXT.get(language, INVITATION_TEXT['en'])
+        subject = subject_template.format(game_date=game_date)
+        body = body_template.format(
+            player_name=player_name,
+            game_date=game_date,
+            game_time=game_time,
+            venue=venue,
+            confirm_url=confirm_url,
+            decline_url=decline_url
+        )
     
-        return EmailService.send_email(subject, [player_email], body, html)
+        return subject, body, html
     
     @staticmethod
     def send_test_email(recipient: str):
@@ -0,0 +1,35 @@
+"""
+Fast JSON provider for Flask responses backed by orjson.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; Flask's stdlib provider is used instead
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson, keeping Flask's output conventions."""
+
+    # Dates go through Flask's default hook (HTTP date strings) like the stdlib provider,
+    # sorted keys match DefaultJSONProvider.sort_keys, and int keys are stringified as json does
+    _options = (
+        (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        if orjson is not None else 0
+    )
+
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string."""
+        option = self._options
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string or bytes."""
+        return orjson.loads(s)
+
+def init_json_provider(app):
+    """Install the orjson provider on the app when orjson is available."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -3,9 +3,37 @@ Middleware for multi-tenant request processing.
 """
 from flask import request, g, current_app, session, jsonify
 from flask_login import current_user, logout_user
-from utils.tenant import get_current_tenant, set_tenant_context
+from utils.tenant import resolve_tenant_context
 from app import db
 
+# Path prefixes that bypass tenant processing; str.startswith tests the whole
+# tuple in one call
+SKIP_TENANT_PREFIXES = (
+    # Static files and health checks
+    '/health',
+    '/metrics',
+    '/favicon.ico',
+    '/static/',
+    '/_debug_toolbar/',
+    '/api/email/test-simple',
+    '/api/email/test-invitation', 
+    '/api/invitations/respond/',  
+    '/api/auth/me',  # Add this - allow checking auth status
+    '/api/auth/csrf-token',  # Add this too
+    '/api/auth/login',  # Add this - allow login without tenant context first
+    '/api/auth/logout',  # Add this too
+    '/api/onboarding/register',  # Add this line
+    '/api/onboarding/check-availability',  # Allow availability checks
+    # Admin routes (global admin interface)
+    '/admin/',
+)
+
+# Exact paths: tenant registration/onboarding pages and the admin DB init endpoint
+SKIP_TENANT_PATHS = frozenset({'/register', '/signup', '/onboard', '/api/admin/init-db'})
+
+# Per-request tenant attributes on g
+TENANT_CONTEXT_ATTRS = ('tenant', 'tenant_id', 'current_tenant')
+
 class TenantMiddleware:
     """Middleware to handle tenant context for each request."""
     
@@ -20,35 +48,24 @@ class TenantMiddleware:
         app.after_request(self.after_request)
     
     def before_request(self):
-                
-        # Skip tenant check for certain admin endpoints
-        if request.path == '/api/admin/init-db':
-            return None
-        
-        # Skip OPTIONS requests (CORS preflight)
-        if request.method == 'OPTIONS':
-            return
-        
         """Process tenant context before each request."""
-        # Skip tenant processing for certain paths
-        if self.should_skip_tenant_processing():
+        # Skip OPTIONS requests (CORS preflight) and paths without tenant context
+        if request.method == 'OPTIONS' or self.should_skip_tenant_processing():
             return
         
-        # Get current tenant
-        tenant = get_current_tenant()
-        
-        # Set tenant context for database queries
+        # Get current tenant and set its context for database queries
+        tenant = resolve_tenant_context()
         if tenant:
-            set_tenant_context()
             g.tenant = tenant
-            g.tenant_id = tenant.id
+        
+        is_api = request.path.startswith('/api/')
         
         # For API routes, ensure tenant is present
-        if request.path.startswith('/api/') and not tenant:
+        if is_api and not tenant:
             return jsonify({'error': 'Tenant context required'}), 400
         
         # Enforce tenant-aware sessions: if authenticated, session tenant must match request tenant
-        if request.path.startswith('/api/') and tenant:
+        if is_api and tenant:
             try:
                 if current_user.is_authenticated:
                     sess_tenant_id = session.get('tenant_id')
@@ -66,46 +83,15 @@ class TenantMiddleware:
     
     def after_request(self, response):
         """Clean up after request processing."""
-        # Clean up tenant context
-        if hasattr(g, 'tenant'):
-            delattr(g, 'tenant')
-        if hasattr(g, 'tenant_id'):
-            delattr(g, 'tenant_id')
-        if hasattr(g, 'current_tenant'):
-            delattr(g, 'current_tenant')
+        # Clean up tenant context; g can outlive the request when an app
+        # context is already pushed (tests, CLI), so it isn't left to teardown
+        for name in TENANT_CONTEXT_ATTRS:
+            g.pop(name, None)
         
         return response
     
-    def should_skip_tenant_processing(self):
+    @staticmethod
+    def should_skip_tenant_processing():
         """Determine if tenant processing should be skipped for this request."""
-        skip_paths = [
-            '/health',
-            '/metrics',
-            '/favicon.ico',
-            '/static/',
-            '/_debug_toolbar/',
-            '/api/email/test-simple',
-            '/api/email/test-invitation', 
-            '/api/invitations/respond/',  
-            '/api/auth/me',  # Add this - allow checking auth status
-            '/api/auth/csrf-token',  # Add this too
-            '/api/auth/login',  # Add this - allow login without tenant context first
-            '/api/auth/logout',  # Add this too
-            '/api/onboarding/register',  # Add this line
-            '/api/onboarding/check-availability',  # Allow availability checks
-        ]
-        
-        # Skip for static files and health checks
-        for path in skip_paths:
-            if request.path.startswith(path):
-                return True
-        
-        # Skip for admin routes (global admin interface)
-        if request.path.startswith('/admin/'):
-            return True
-        
-        # Skip for tenant registration/onboarding
-        if request.path in ['/register', '/signup', '/onboard']:
-            return True
-        
-        return False
+        path = request.path
+        return path.startswith(SKIP_TENANT_PREFIXES) or path in SKIP_TENANT_PATHS
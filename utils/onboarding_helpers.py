@@ -2,11 +2,19 @@
 Helper functions for tenant onboarding process.
 """
 import re
+from app import db
 from models.tenant import Tenant
 from models.user import User
 from models.player import Player
 from models.game import Game
 
+# Subdomain rules, compiled/built once at import
+SUBDOMAIN_FORMAT_PATTERN = re.compile(r'^[a-z0-9][a-z0-9-]*[a-z0-9]$')
+NON_ALPHANUMERIC_PATTERN = re.compile(r'[^a-zA-Z0-9]')
+RESERVED_SUBDOMAINS = frozenset({
+    'www', 'api', 'admin', 'app', 'mail', 'ftp', 'blog', 'shop', 'store', 'support', 'help'
+})
+
 def validate_organization_data(data):
     """Validate organization registration data."""
     errors = []
@@ -27,13 +35,25 @@ def validate_organization_data(data):
     
     return errors
 
+def _count_for_tenant(model, tenant_id, *criteria):
+    """Scalar subquery counting a tenant's rows, for batching several counts in one SELECT."""
+    return (
+        db.select(db.func.count(model.id))
+        .where(model.tenant_id == tenant_id, *criteria)
+        .scalar_subquery()
+    )
+
 def generate_onboarding_checklist(tenant_id):
     """Generate onboarding checklist for a tenant."""
-    # Count existing data
-    admin_count = User.query.filter_by(tenant_id=tenant_id, role='admin').count()
-    user_count = User.query.filter_by(tenant_id=tenant_id).count()
-    player_count = Player.query.filter_by(tenant_id=tenant_id).count()
-    game_count = Game.query.filter_by(tenant_id=tenant_id).count()
+    # Count existing data (all counts in a single round-trip)
+    admin_count, user_count, player_count, game_count = db.session.execute(
+        db.select(
+            _count_for_tenant(User, tenant_id, User.role == 'admin'),
+            _count_for_tenant(User, tenant_id),
+            _count_for_tenant(Player, tenant_id),
+            _count_for_tenant(Game, tenant_id)
+        )
+    ).one()
     
     checklist = [
         {
@@ -100,42 +120,52 @@ def generate_onboarding_checklist(tenant_id):
         'optional_total': len([task for task in checklist if not task['required']])
     }
 
+# Static onboarding content, built once at import and shared by every call
+ONBOARDING_TIPS = (
+    {
+        'category': 'Getting Started',
+        'tips': (
+            "Start by adding your regular players first, then add spare players",
+            "Set up your team colors and jersey preferences early",
+            "Test email invitations with a small group before your first game"
+        )
+    },
+    {
+        'category': 'Player Management',
+        'tips': (
+            "Use clear position categories (Goaltender, Defence, Forward)",
+            "Set spare player priorities (Priority 1 for first call-ups)",
+            "Include player photos to help with team recognition"
+        )
+    },
+    {
+        'category': 'Game Scheduling',
+        'tips': (
+            "Schedule games at least a week in advance for better attendance",
+            "Set up recurring games for regular weekly/monthly sessions",
+            "Use the automatic spare rotation to ensure fair play opportunities"
+        )
+    },
+    {
+        'category': 'Communication',
+        'tips': (
+            "Customize email templates to match your team's tone",
+            "Set up bilingual templates if you have English/French players",
+            "Use the assignment rotation feature to share organizational tasks"
+        )
+    }
+)
+
+WELCOME_NEXT_STEPS = (
+    "Complete your team configuration",
+    "Add your players to the roster",
+    "Schedule your first pickup game",
+    "Invite other organizers if needed"
+)
+
 def get_onboarding_tips():
     """Get helpful onboarding tips."""
-    return [
-        {
-            'category': 'Getting Started',
-            'tips': [
-                "Start by adding your regular players first, then add spare players",
-                "Set up your team colors and jersey preferences early",
-                "Test email invitations with a small group before your first game"
-            ]
-        },
-        {
-            'category': 'Player Management',
-            'tips': [
-                "Use clear position categories (Goaltender, Defence, Forward)",
-                "Set spare player priorities (Priority 1 for first call-ups)",
-                "Include player photos to help with team recognition"
-            ]
-        },
-        {
-            'category': 'Game Scheduling',
-            'tips': [
-                "Schedule games at least a week in advance for better attendance",
-                "Set up recurring games for regular weekly/monthly sessions",
-                "Use the automatic spare rotation to ensure fair play opportunities"
-            ]
-        },
-        {
-            'category': 'Communication',
-            'tips': [
-                "Customize email templates to match your team's tone",
-                "Set up bilingual templates if you have English/French players",
-                "Use the assignment rotation feature to share organizational tasks"
-            ]
-        }
-    ]
+    return ONBOARDING_TIPS
 
 def generate_welcome_email_content(tenant, admin_user):
     """Generate welcome email content for new tenant."""
@@ -149,12 +179,7 @@ def generate_welcome_email_content(tenant, admin_user):
             'login_url': f"https://{tenant.subdomain}.hockey-manager.com/login",
             'setup_url': f"https://{tenant.subdomain}.hockey-manager.com/onboarding",
             'support_email': 'support@hockey-manager.com',
-            'next_steps': [
-                "Complete your team configuration",
-                "Add your players to the roster",
-                "Schedule your first pickup game",
-                "Invite other organizers if needed"
-            ]
+            'next_steps': WELCOME_NEXT_STEPS
         }
     }
 
@@ -170,12 +195,11 @@ def validate_subdomain_format(subdomain):
         return False, "Subdomain must be less than 30 characters"
     
     # Format check
-    if not re.match(r'^[a-z0-9][a-z0-9-]*[a-z0-9]$', subdomain):
+    if not SUBDOMAIN_FORMAT_PATTERN.match(subdomain):
         return False, "Subdomain can only contain lowercase letters, numbers, and hyphens (not at the start or end)"
     
     # Reserved subdomains
-    reserved = ['www', 'api', 'admin', 'app', 'mail', 'ftp', 'blog', 'shop', 'store', 'support', 'help']
-    if subdomain in reserved:
+    if subdomain in RESERVED_SUBDOMAINS:
         return False, "This subdomain is reserved"
     
     return True, "Valid subdomain format"
@@ -183,7 +207,7 @@ def validate_subdomain_format(subdomain):
 def suggest_subdomains(base_name, count=5):
     """Generate subdomain suggestions based on organization name."""
     # Clean base name
-    base = re.sub(r'[^a-zA-Z0-9]', '', base_name.lower())
+    base = NON_ALPHANUMERIC_PATTERN.sub('', base_name.lower())
     base = base[:20]  # Limit length
     
     suggestions = []
@@ -205,13 +229,18 @@ def suggest_subdomains(base_name, count=5):
             f"{base}hc{i}"
         ])
     
-    # Check availability and add to suggestions
-    for variation in variations:
+    # Check availability of every well-formed variation with one IN query
+    candidates = [v for v in variations if validate_subdomain_format(v)[0]]
+    taken = set()
+    if candidates:
+        taken = set(db.session.execute(
+            db.select(Tenant.subdomain).where(Tenant.subdomain.in_(candidates))
+        ).scalars())
+    
+    for variation in candidates:
         if len(suggestions) >= count:
             break
-        
-        is_valid, _ = validate_subdomain_format(variation)
-        if is_valid and not Tenant.query.filter_by(subdomain=variation).first():
+        if variation not in taken:
             suggestions.append(variation)
     
     return suggestions[:count]
@@ -244,10 +273,27 @@ def calculate_setup_progress(tenant_id):
         }
     }
     
+    # All counts in a single round-trip; the player counts share one pass over
+    # the tenant's players via conditional aggregates
+    player_stats = db.select(
+        db.func.count(Player.id).label('players'),
+        db.func.count(db.case((Player.position == 'goaltender', 1))).label('goaltenders'),
+        db.func.count(db.case((Player.player_type == 'spare', 1))).label('spares')
+    ).where(Player.tenant_id == tenant_id).subquery()
+    
+    admin_count, player_count, goaltender_count, spare_count, game_count = db.session.execute(
+        db.select(
+            _count_for_tenant(User, tenant_id, User.role == 'admin'),
+            player_stats.c.players,
+            player_stats.c.goaltenders,
+            player_stats.c.spares,
+            _count_for_tenant(Game, tenant_id)
+        )
+    ).one()
+    
     # Basic setup checks
-    admin_exists = User.query.filter_by(tenant_id=tenant_id, role='admin').first() is not None
     progress['categories']['basic_setup']['items'] = [
-        {'name': 'Admin account created', 'completed': admin_exists}
+        {'name': 'Admin account created', 'completed': admin_count > 0}
     ]
     
     # Team configuration checks (placeholder)
@@ -257,15 +303,13 @@ def calculate_setup_progress(tenant_id):
     ]
     
     # Player management checks
-    player_count = Player.query.filter_by(tenant_id=tenant_id).count()
     progress['categories']['player_management']['items'] = [
         {'name': 'At least 5 players added', 'completed': player_count >= 5},
-        {'name': 'Goaltenders added', 'completed': Player.query.filter_by(tenant_id=tenant_id, position='goaltender').count() > 0},
-        {'name': 'Spare players configured', 'completed': Player.query.filter_by(tenant_id=tenant_id, player_type='spare').count() > 0}
+        {'name': 'Goaltenders added', 'completed': goaltender_count > 0},
+        {'name': 'Spare players configured', 'completed': spare_count > 0}
     ]
     
     # Game scheduling checks
-    game_count = Game.query.filter_by(tenant_id=tenant_id).count()
     progress['categories']['game_scheduling']['items'] = [
         {'name': 'First game scheduled', 'completed': game_count > 0}
     ]
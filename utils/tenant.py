@@ -2,19 +2,106 @@
 Multi-tenant utility functions for tenant context and isolation.
 """
 from flask import request, g, current_app, abort
-from functools import wraps
-from sqlalchemy import text
+from functools import lru_cache, wraps
+from sqlalchemy import event, text
+from collections import OrderedDict
 import re
-from app import db
+import threading
+from app import db, cache
+from utils.cache import tenant_lookup_key
+
+# Identifier (slug/subdomain) -> tenant id: a bounded process-local LRU in
+# front of the shared cache, so other workers resolve without a slug scan
+TENANT_ID_CACHE_SIZE = 1024
+_tenant_id_cache = OrderedDict()
+_tenant_id_cache_lock = threading.Lock()
+
+def _cached_tenant_id(identifier):
+    """Return the cached tenant id for a slug/subdomain, or None."""
+    with _tenant_id_cache_lock:
+        tenant_id = _tenant_id_cache.get(identifier)
+        if tenant_id is not None:
+            _tenant_id_cache.move_to_end(identifier)
+        return tenant_id
+
+def _cache_tenant_id(identifier, tenant_id):
+    """Remember the tenant id for a slug/subdomain, evicting the oldest entry."""
+    with _tenant_id_cache_lock:
+        _tenant_id_cache[identifier] = tenant_id
+        _tenant_id_cache.move_to_end(identifier)
+        if len(_tenant_id_cache) > TENANT_ID_CACHE_SIZE:
+            _tenant_id_cache.popitem(last=False)
+
+def invalidate_tenant_lookup(*identifiers):
+    """Forget cached tenant ids for the given identifiers (all local entries if none given)."""
+    identifiers = [identifier for identifier in identifiers if identifier]
+    with _tenant_id_cache_lock:
+        if not identifiers:
+            _tenant_id_cache.clear()
+        for identifier in identifiers:
+            _tenant_id_cache.pop(identifier, None)
+    if identifiers:
+        cache.delete(*(tenant_lookup_key(identifier) for identifier in identifiers))
+
+# Leading host labels that never name a tenant
+NON_TENANT_SUBDOMAINS = frozenset({'www', 'api', 'admin', 'localhost'})
+
+@lru_cache(maxsize=4096)
+def _subdomain_from_host(host):
+    """Return the tenant subdomain for a Host header value, or None."""
+    subdomain, dot, _ = host.partition('.')
+    if not dot:
+        return None
+    subdomain = subdomain.lower()
+    return None if subdomain in NON_TENANT_SUBDOMAINS else subdomain
+
+def _load_tenant(identifier, prefer='subdomain'):
+    """Load the active tenant for a slug/subdomain, using the id cache when possible.
+    
+    prefer names the column the identifier most likely matches ('subdomain' for
+    host/header lookups, 'slug' for path lookups); it is queried first.
+    """
+    from models.tenant import Tenant
+    
+    tenant_id = _cached_tenant_id(identifier)
+    if tenant_id is None:
+        shared_id = cache.get(tenant_lookup_key(identifier))
+        if shared_id is not None:
+            tenant_id = int(shared_id)
+    
+    # Cache hit: primary-key load (identity map first), then confirm it still matches
+    if tenant_id is not None:
+        tenant = db.session.get(Tenant, tenant_id)
+        if tenant and tenant.is_active and identifier in (tenant.slug, tenant.subdomain):
+            _cache_tenant_id(identifier, tenant.id)
+            return tenant
+        invalidate_tenant_lookup(identifier)
+    
+    # One unique-index lookup on the preferred column; the other column is only
+    # tried on a miss when the identifier is well-formed for it
+    if prefer == 'subdomain':
+        column, fallback, fallback_valid = Tenant.subdomain, Tenant.slug, Tenant.is_valid_slug
+    else:
+        column, fallback, fallback_valid = Tenant.slug, Tenant.subdomain, Tenant.is_valid_subdomain
+    tenant = Tenant.query.filter(column == identifier, Tenant.is_active == True).first()
+    if not tenant and fallback_valid(identifier):
+        tenant = Tenant.query.filter(fallback == identifier, Tenant.is_active == True).first()
+    
+    # Misses are not cached so newly registered tenants resolve immediately
+    if tenant:
+        _cache_tenant_id(identifier, tenant.id)
+        cache.set(tenant_lookup_key(identifier), str(tenant.id))
+    return tenant
 
 def get_current_tenant():
     """Get the current tenant based on request context."""
-    # Check if tenant is already set in g
-    if hasattr(g, 'current_tenant'):
+    # Check if tenant was already resolved for this request (including misses)
+    if 'current_tenant' in g:
         return g.current_tenant
     
     # Extract tenant from subdomain or path
     tenant_identifier = None
+    lookup_prefer = 'subdomain'
     
     # Method 0: Header-based tenant identification (for cross-domain API calls)
     tenant_header = request.headers.get('X-Tenant-Subdomain')
@@ -23,31 +110,26 @@ def get_current_tenant():
     
     # Method 1: Subdomain-based tenant identification (only if not found in header)
     if not tenant_identifier and current_app.config.get('TENANT_URL_SUBDOMAIN_ENABLED', True):
-        host = request.host.lower()
-        if '.' in host:
-            subdomain = host.split('.')[0]
-            if subdomain not in ['www', 'api', 'admin', 'localhost']:
-                tenant_identifier = subdomain
+        tenant_identifier = _subdomain_from_host(request.host)
     
     # Method 2: Path-based tenant identification
     if not tenant_identifier and current_app.config.get('TENANT_URL_PATH_ENABLED', False):
         path_parts = request.path.strip('/').split('/')
         if len(path_parts) > 0 and path_parts[0] and path_parts[0] not in ['api', 'admin']:
             tenant_identifier = path_parts[0]
+            lookup_prefer = 'slug'
     
     # Query database for tenant
     if tenant_identifier:
-        from models.tenant import Tenant
-        tenant = Tenant.query.filter(
-            (Tenant.slug == tenant_identifier) | 
-            (Tenant.subdomain == tenant_identifier)
-        ).filter(Tenant.is_active == True).first()
+        tenant = _load_tenant(tenant_identifier, lookup_prefer)
         
         if tenant:
             g.current_tenant = tenant
             g.tenant_id = tenant.id
             return tenant
     
+    # Remember the miss so repeated calls within the request don't re-query
+    g.current_tenant = None
     return None
 
 def get_tenant_id():
@@ -58,6 +140,9 @@ def get_tenant_id():
     tenant = get_current_tenant()
     return tenant.id if tenant else None
 
+# Name used by utils.query_filter and the isolation tests
+get_current_tenant_id = get_tenant_id
+
 def require_tenant(f):
     """Decorator to require tenant context for a route."""
     @wraps(f)
@@ -72,20 +157,85 @@ def tenant_required(f):
     """Alternative decorator name for requiring tenant context."""
     return require_tenant(f)
 
-def set_tenant_context():
-    """Set tenant context for database queries."""
+# Statements publishing the tenant id as a database session variable, by dialect;
+# other dialects (SQLite) rely on g.tenant_id alone
+TENANT_SQL_SETTERS = {
+    'mysql': text("SET @tenant_id = :tenant_id"),
+    'postgresql': text("SELECT set_config('app.tenant_id', CAST(:tenant_id AS text), false)"),
+}
+
+# Dialects whose setting is undone when the transaction that set it rolls back
+# (MySQL user variables are not transactional)
+TRANSACTIONAL_TENANT_SETTERS = frozenset({'postgresql'})
+
+def _commit_connection_tenant(info):
+    """Make the tenant set in the committed transaction the connection's known tenant."""
+    if 'pending_tenant_id' in info:
+        info['tenant_id'] = info.pop('pending_tenant_id')
+
+def _discard_pending_tenant(info):
+    """Forget a tenant set in a transaction that was rolled back."""
+    info.pop('pending_tenant_id', None)
+
+def _forget_connection_tenant(info):
+    """Forget every tenant remembered for a connection."""
+    info.pop('tenant_id', None)
+    info.pop('pending_tenant_id', None)
+
+def _tenant_sql_setter():
+    """Return the app's (statement, connection info key) for the tenant variable, or None.
+    
+    Resolved once per app. Pooled connections remember the tenant they carry in
+    connection.info, so requests for the same tenant skip the statement.
+    """
+    extensions = current_app.extensions
+    if 'tenant_sql_setter' not in extensions:
+        engine = db.engine
+        dialect = engine.dialect.name
+        setter = TENANT_SQL_SETTERS.get(dialect)
+        if setter is not None:
+            event.listen(engine, 'connect', lambda dbapi_connection, connection_record:
+                         _forget_connection_tenant(connection_record.info))
+            if dialect in TRANSACTIONAL_TENANT_SETTERS:
+                # A SET only sticks once its transaction commits; a rollback,
+                # including the pool's reset on check-in, restores the last
+                # committed value
+                event.listen(engine, 'commit', lambda conn: _commit_connection_tenant(conn.info))
+                event.listen(engine, 'rollback', lambda conn: _discard_pending_tenant(conn.info))
+                event.listen(engine, 'reset', lambda dbapi_connection, connection_record, reset_state:
+                             _discard_pending_tenant(connection_record.info))
+                setter = (setter, 'pending_tenant_id')
+            else:
+                setter = (setter, 'tenant_id')
+        extensions['tenant_sql_setter'] = setter
+    return extensions['tenant_sql_setter']
+
+def set_tenant_context(tenant=None):
+    """Set tenant context for database queries (for the given tenant, if passed)."""
+    if tenant is not None:
+        g.current_tenant = tenant
+        g.tenant_id = tenant.id
+    
+    # Store in Flask's g object (already done by get_current_tenant)
     tenant_id = get_tenant_id()
-    if tenant_id:
-        # Store in Flask's g object (already done by get_current_tenant)
-        # Only set database session variable for PostgreSQL/MySQL, not SQLite
-        try:
-            # Check database dialect
-            if db.engine.dialect.name in ['postgresql', 'mysql']:
-                db.session.execute(text("SET @tenant_id = :tenant_id"), {"tenant_id": tenant_id})
-        except Exception:
-            # Silently fail for SQLite or if there's any issue
-            # The tenant_id is already available in g.tenant_id
-            pass
+    setter = _tenant_sql_setter()
+    if not tenant_id or setter is None:
+        return
+    
+    # Skip the round-trip when this pooled connection already carries the tenant
+    statement, info_key = setter
+    connection = db.session.connection()
+    info = connection.info
+    if info.get('pending_tenant_id', info.get('tenant_id')) != tenant_id:
+        connection.execute(statement, {"tenant_id": tenant_id})
+        info[info_key] = tenant_id
+
+def resolve_tenant_context():
+    """Resolve the request's tenant and publish it to the database session; returns the tenant or None."""
+    tenant = get_current_tenant()
+    if tenant:
+        set_tenant_context()
+    return tenant
 
 def get_tenant_filter():
     """Get tenant filter for database queries."""
@@ -97,23 +247,36 @@ def get_tenant_filter():
 def validate_tenant_access(model_instance):
     """Validate that the current tenant has access to the model instance."""
     tenant_id = get_tenant_id()
-    if tenant_id and hasattr(model_instance, 'tenant_id'):
-        if model_instance.tenant_id != tenant_id:
-            abort(403, description="Access denied to this resource")
+    # One getattr with a default instead of hasattr + attribute read; models
+    # without tenant_id compare equal and pass
+    if tenant_id and getattr(model_instance, 'tenant_id', tenant_id) != tenant_id:
+        abort(403, description="Access denied to this resource")
     return True
 
+# Slug cleanup patterns, compiled once at import
+SLUG_INVALID_CHARS_PATTERN = re.compile(r'[^a-z0-9\-]')
+SLUG_REPEATED_HYPHENS_PATTERN = re.compile(r'-+')
+
 def generate_tenant_slug(name):
     """Generate a URL-safe slug from organization name."""
     # Convert to lowercase and replace spaces with hyphens
     slug = name.lower().strip()
     # Remove special characters except hyphens
-    slug = re.sub(r'[^a-z0-9\-]', '', slug.replace(' ', '-'))
+    slug = SLUG_INVALID_CHARS_PATTERN.sub('', slug.replace(' ', '-'))
     # Remove multiple consecutive hyphens
-    slug = re.sub(r'-+', '-', slug)
+    slug = SLUG_REPEATED_HYPHENS_PATTERN.sub('-', slug)
     # Remove leading/trailing hyphens
     slug = slug.strip('-')
     return slug
 
+# Characters allowed in a subdomain; a set check is cheaper than a regex match
+SUBDOMAIN_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789-')
+
+# Subdomains tenants may not register
+RESERVED_TENANT_SUBDOMAINS = frozenset({
+    'www', 'api', 'admin', 'app', 'mail', 'ftp', 'localhost', 'staging', 'dev', 'test'
+})
+
 def validate_subdomain(subdomain):
     """Validate subdomain format and availability."""
     # Check length
@@ -124,12 +287,12 @@ def validate_subdomain(subdomain):
         return False, "Subdomain must be less than 63 characters"
     
     # Check format (alphanumeric and hyphens only, must start/end with alphanumeric)
-    if not re.match(r'^[a-z0-9][a-z0-9\-]*[a-z0-9]$', subdomain):
+    if (subdomain[0] == '-' or subdomain[-1] == '-'
+            or not SUBDOMAIN_CHARS.issuperset(subdomain)):
         return False, "Subdomain must contain only lowercase letters, numbers, and hyphens, and must start and end with a letter or number"
     
     # Check for reserved subdomains
-    reserved = ['www', 'api', 'admin', 'app', 'mail', 'ftp', 'localhost', 'staging', 'dev', 'test']
-    if subdomain in reserved:
+    if subdomain in RESERVED_TENANT_SUBDOMAINS:
         return False, f"'{subdomain}' is a reserved subdomain"
     
     return True, "Valid subdomain"
\ No newline at end of file
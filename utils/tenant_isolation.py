@@ -1,14 +1,39 @@
 """
 Enhanced tenant isolation middleware with automatic query filtering.
 """
-from flask import g, request, has_request_context
+from flask import g, request, jsonify, has_app_context
+from flask_sqlalchemy.query import Query
+from flask_sqlalchemy.session import Session
 from sqlalchemy import event
-from sqlalchemy.orm import Query
+from sqlalchemy.orm import with_loader_criteria
 from functools import wraps
 import logging
+from app import db
+from utils.base_model import TenantMixin
+from utils.tenant import get_current_tenant, get_tenant_id, resolve_tenant_context
 
 logger = logging.getLogger(__name__)
 
+# Path prefixes that bypass tenant detection; str.startswith tests the whole
+# tuple in one call
+SKIP_DETECTION_PREFIXES = (
+    '/health',
+    '/api/tenants/register',
+    '/static/',
+    '/_debug_toolbar/'
+)
+
+# Mapped class -> whether it has a tenant_id attribute, filled on first sight
+# so flushes don't probe every new object with hasattr
+_tenant_model_flags = {}
+
+def _is_tenant_model(cls):
+    """Return True if instances of cls carry a tenant_id."""
+    flag = _tenant_model_flags.get(cls)
+    if flag is None:
+        flag = _tenant_model_flags[cls] = hasattr(cls, 'tenant_id')
+    return flag
+
 class TenantIsolationMiddleware:
     """Comprehensive tenant isolation middleware."""
     
@@ -23,109 +48,50 @@ class TenantIsolationMiddleware:
         self.app = app
         self.db = db
         
+        # Hooks are registered once per app; a second middleware would make
+        # every request run them twice
+        if 'tenant_isolation' in app.extensions:
+            return
+        app.extensions['tenant_isolation'] = self
+        
         # Set up request hooks
         app.before_request(self.before_request)
         app.after_request(self.after_request)
         
-        # Set up SQLAlchemy event listeners
-        self.setup_query_listeners()
-        
         logger.info("Tenant isolation middleware initialized")
     
     def before_request(self):
         """Set up tenant context before each request."""
-        from utils.tenant import detect_tenant_from_request, set_tenant_context
-        
         # Skip tenant detection for certain routes
         if self.should_skip_tenant_detection():
             return
         
         try:
-            tenant = detect_tenant_from_request()
+            # Resolved once per request; the tenant and its id are memoized on g,
+            # where the query criteria and insert hooks read them
+            tenant = resolve_tenant_context()
             if tenant:
-                set_tenant_context(tenant)
-                logger.debug(f"Tenant context set: {tenant.slug}")
+                logger.debug("Tenant context set: %s", tenant.slug)
             else:
                 logger.debug("No tenant detected for request")
         except Exception as e:
-            logger.error(f"Error setting tenant context: {e}")
+            logger.error("Error setting tenant context: %s", e)
     
     def after_request(self, response):
         """Clean up tenant context after request."""
-        if hasattr(g, 'current_tenant'):
-            delattr(g, 'current_tenant')
-        if hasattr(g, 'current_tenant_id'):
-            delattr(g, 'current_tenant_id')
+        g.pop('current_tenant', None)
+        g.pop('tenant_id', None)
         return response
     
     def should_skip_tenant_detection(self):
         """Check if tenant detection should be skipped for this request."""
-        skip_paths = [
-            '/health',
-            '/api/tenants/register',
-            '/static/',
-            '/_debug_toolbar/'
-        ]
-        
-        path = request.path
-        return any(path.startswith(skip_path) for skip_path in skip_paths)
-    
-    def setup_query_listeners(self):
-        """Set up SQLAlchemy event listeners for automatic tenant filtering."""
-        
-        @event.listens_for(self.db.session, 'before_flush')
-        def before_flush(session, flush_context, instances):
-            """Ensure all new objects have tenant_id set."""
-            from utils.tenant import get_tenant_id
-            
-            if not has_request_context():
-                return
-            
-            tenant_id = get_tenant_id()
-            if not tenant_id:
-                return
-            
-            for obj in session.new:
-                if hasattr(obj, 'tenant_id') and obj.tenant_id is None:
-                    obj.tenant_id = tenant_id
-                    logger.debug(f"Auto-assigned tenant_id {tenant_id} to {obj.__class__.__name__}")
-        
-        @event.listens_for(Query, 'before_bulk_update')
-        def before_bulk_update(query_context):
-            """Filter bulk updates by tenant."""
-            self._filter_bulk_operation(query_context)
-        
-        @event.listens_for(Query, 'before_bulk_delete')
-        def before_bulk_delete(query_context):
-            """Filter bulk deletes by tenant."""
-            self._filter_bulk_operation(query_context)
-    
-    def _filter_bulk_operation(self, query_context):
-        """Apply tenant filter to bulk operations."""
-        from utils.tenant import get_tenant_id
-        
-        if not has_request_context():
-            return
-        
-        model_class = query_context.mapper.class_
-        if not hasattr(model_class, 'tenant_id'):
-            return
-        
-        tenant_id = get_tenant_id()
-        if tenant_id:
-            # Add tenant filter to the query
-            query_context.whereclause = query_context.whereclause & (
-                model_class.tenant_id == tenant_id
-            )
-            logger.debug(f"Applied tenant filter to bulk operation on {model_class.__name__}")
+        return request.path.startswith(SKIP_DETECTION_PREFIXES)
+
 
 def tenant_required(f):
     """Decorator to ensure a tenant context is available."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        from utils.tenant import get_current_tenant
-        from flask import jsonify
-        
         tenant = get_current_tenant()
         if not tenant:
             return jsonify({'error': 'Tenant context required'}), 400
@@ -135,10 +101,8 @@ def tenant_required(f):
 
 def validate_tenant_access(model_instance):
     """Validate that the current user can access the given model instance."""
-    from utils.tenant import get_tenant_id
-    from flask_login import current_user
-    
-    if not hasattr(model_instance, 'tenant_id'):
+    model_class = type(model_instance)
+    if not _is_tenant_model(model_class):
         return True
     
     current_tenant_id = get_tenant_id()
@@ -147,47 +111,83 @@ def validate_tenant_access(model_instance):
     
     # Check if the model belongs to the current tenant
     if model_instance.tenant_id != current_tenant_id:
-        logger.warning(f"Tenant access violation: user tried to access {model_instance.__class__.__name__} "
-                      f"from tenant {model_instance.tenant_id} while in tenant {current_tenant_id}")
+        logger.warning("Tenant access violation: user tried to access %s from tenant %s while in tenant %s",
+                       model_class.__name__, model_instance.tenant_id, current_tenant_id)
         return False
     
     return True
 
+def belongs_to_current_tenant(obj):
+    """Return False if obj is owned by a tenant other than the current tenant."""
+    if obj is None or not _is_tenant_model(type(obj)) or not has_app_context():
+        return True
+    
+    # Same source as the query criteria hook, so both agree on the tenant
+    tenant_id = g.get('tenant_id')
+    return not tenant_id or obj.tenant_id == tenant_id
+
+def get_tenant_scoped(model_class, ident):
+    """Primary-key lookup through session.get (identity map first), scoped to the current tenant."""
+    obj = db.session.get(model_class, ident)
+    return obj if belongs_to_current_tenant(obj) else None
+
+class TenantQuery(Query):
+    """Query class shared by every tenant-isolated model."""
+    
+    def get(self, ident):
+        # A miss emits a pk SELECT that the criteria hook filters, so another
+        # tenant's row is never fetched; a hit emits no SQL, so it is checked
+        # against the same g.tenant_id here instead
+        obj = super().get(ident)
+        return obj if belongs_to_current_tenant(obj) else None
+
+def _apply_tenant_criteria(execute_state):
+    """Limit ORM SELECT/UPDATE/DELETE on isolated models to the current tenant."""
+    if not (execute_state.is_select or execute_state.is_update or execute_state.is_delete):
+        return
+    if not has_app_context():
+        return
+    
+    # Read g directly: resolving the tenant here would recurse into this hook
+    tenant_id = g.get('tenant_id')
+    if not tenant_id:
+        return
+    
+    # Added at compile time, so it also covers relationship and joined loads;
+    # tenant_id is tracked as a bound parameter, keeping the statement cacheable
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(
+            TenantMixin,
+            lambda cls: cls.tenant_id == tenant_id,
+            include_aliases=True
+        )
+    )
+
+def _install_tenant_criteria():
+    """Register the tenant criteria hook once, on every Flask-SQLAlchemy session."""
+    # Listening on the class rather than db.session also covers sessions from
+    # other sessionmakers (e.g. the tests' connection-bound session)
+    if not event.contains(Session, 'do_orm_execute', _apply_tenant_criteria):
+        event.listen(Session, 'do_orm_execute', _apply_tenant_criteria)
+
+def _assign_tenant_id(mapper, connection, target):
+    """Fill in a missing tenant_id from the current tenant as the row is inserted."""
+    if target.tenant_id is None and has_app_context():
+        # Read g directly: the tenant can't be looked up mid-flush
+        target.tenant_id = g.get('tenant_id')
+        if target.tenant_id is not None:
+            logger.debug("Auto-assigned tenant_id %s to %s", target.tenant_id, mapper.class_.__name__)
+
 def enforce_tenant_isolation(model_class):
     """Class decorator to enforce tenant isolation on a model."""
-    from flask import has_request_context
-    
-    # Store reference to the original query class
-    _original_query_class = model_class.__dict__.get('query_class')
+    # Queries are filtered by the session-wide do_orm_execute hook
+    _install_tenant_criteria()
     
-    # Don't try to access .query at decoration time - it requires app context
-    # Instead, we'll create a custom query class that filters automatically
-    
-    class TenantQuery(model_class.query_class if hasattr(model_class, 'query_class') else db.Query):
-        def get(self, ident):
-            # Override get to add tenant filtering
-            obj = super().get(ident)
-            if obj and hasattr(obj, 'tenant_id'):
-                from utils.tenant import get_tenant_id
-                if has_request_context():
-                    tenant_id = get_tenant_id()
-                    if tenant_id and obj.tenant_id != tenant_id:
-                        return None
-            return obj
-        
-        def __iter__(self):
-            # Override iteration to add tenant filtering
-            from utils.tenant import get_tenant_id
-            
-            if has_request_context() and hasattr(model_class, 'tenant_id'):
-                tenant_id = get_tenant_id()
-                if tenant_id:
-                    # Add tenant filter to the query
-                    return super().filter(model_class.tenant_id == tenant_id).__iter__()
-            
-            return super().__iter__()
+    # Only this model's inserts run the hook, rather than a scan of every
+    # new object in each flush
+    event.listen(model_class, 'before_insert', _assign_tenant_id)
     
-    # Set the custom query class
+    # Set the shared tenant query class
     model_class.query_class = TenantQuery
     
     return model_class